@@ -36,6 +36,8 @@ export async function POST(req: Request) {
         price,
         weight,
         protein_per_100g,
+        price_per_kg,
+        protein_per_dollar,
         Kilojoules_per_serving,
         category,
         ingredients
@@ -53,6 +55,8 @@ export async function POST(req: Request) {
            - Price: $${p.price != null ? Number(p.price).toFixed(2) : '—'}
            - Weight: ${p.weight}kg
            - Protein per 100g: ${p.protein_per_100g}g
+           - Price per kg: $${p.price_per_kg != null ? Number(p.price_per_kg).toFixed(2) : '—'}
+           - Protein per dollar: ${p.protein_per_dollar != null ? Number(p.protein_per_dollar).toFixed(1) + 'g' : '—'}
            - Kilojoules per serving: ${p.Kilojoules_per_serving}kJ
            - Category: ${p.category}
            - Ingredients: ${p.ingredients || 'Not specified'}
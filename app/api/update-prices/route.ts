@@ -1,14 +1,140 @@
 // app/api/update-prices/route.ts
 import { NextResponse } from 'next/server';
-import { exec } from 'child_process';
+import { exec, spawn } from 'child_process';
 import { promisify } from 'util';
 
 const execPromise = promisify(exec);
 
+// Keep only the tail of stderr so a chatty run cannot grow memory without bound
+const MAX_STDERR_LENGTH = 10000;
+
+type ScraperResult = {
+  id: string;
+  success: boolean;
+  price?: number;
+  price_per_kg?: number;
+  protein_per_dollar?: number;
+  unchanged?: boolean;
+  error?: string;
+};
+
+type ScraperRun = {
+  results: ScraperResult[];
+  summary: Record<string, any> | null;
+  stderr: string;
+  timedOut: boolean;
+};
+
+// When a resident worker is running (python src/lib/scraping/price_scraper.py --serve),
+// jobs are submitted to it instead of starting a new Python process for every request.
+const WORKER_URL = process.env.SCRAPER_WORKER_URL;
+const WORKER_TOKEN = process.env.SCRAPER_WORKER_TOKEN;
+
+async function callWorker(path: string, init: RequestInit = {}) {
+  const response = await fetch(`${WORKER_URL}${path}`, {
+    ...init,
+    cache: 'no-store',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(WORKER_TOKEN ? { Authorization: `Bearer ${WORKER_TOKEN}` } : {})
+    }
+  });
+  return response.json();
+}
+
+// Runs the scraper in NDJSON mode, parsing one record per line as it arrives so that
+// results finished before a timeout are kept and no output buffer limit applies.
+function runScraper(args: string[], timeoutMs: number): Promise<ScraperRun> {
+  return new Promise((resolve, reject) => {
+    const child = spawn('python', ['src/lib/scraping/price_scraper.py', '--format', 'ndjson', ...args]);
+    const results: ScraperResult[] = [];
+    let summary: Record<string, any> | null = null;
+    let buffered = '';
+    let stderr = '';
+    let timedOut = false;
+
+    const timer = setTimeout(() => {
+      timedOut = true;
+      child.kill();
+    }, timeoutMs);
+
+    child.stdout.setEncoding('utf8');
+    child.stdout.on('data', (chunk: string) => {
+      buffered += chunk;
+      let newline;
+      while ((newline = buffered.indexOf('\n')) >= 0) {
+        const line = buffered.slice(0, newline).trim();
+        buffered = buffered.slice(newline + 1);
+        if (!line) continue;
+        try {
+          const { type, ...record } = JSON.parse(line);
+          if (type === 'summary') {
+            summary = record;
+          } else {
+            results.push(record as ScraperResult);
+          }
+        } catch {
+          console.error('Unparseable scraper output:', line.substring(0, 500));
+        }
+      }
+    });
+
+    child.stderr.setEncoding('utf8');
+    child.stderr.on('data', (chunk: string) => {
+      stderr = (stderr + chunk).slice(-MAX_STDERR_LENGTH);
+    });
+
+    child.on('error', (error) => {
+      clearTimeout(timer);
+      reject(error);
+    });
+    child.on('close', () => {
+      clearTimeout(timer);
+      resolve({ results, summary, stderr, timedOut });
+    });
+  });
+}
+
+// Poll a worker job: GET /api/update-prices?job=<id>
+export async function GET(request: Request) {
+  const jobId = new URL(request.url).searchParams.get('job');
+  if (!WORKER_URL || !jobId) {
+    return NextResponse.json({ success: false, error: 'No price update job to report on' }, { status: 400 });
+  }
+  try {
+    const job = await callWorker(`/jobs/${encodeURIComponent(jobId)}`);
+    if (job.success && job.status === 'failed') {
+      return NextResponse.json({ success: false, error: job.error || 'Price update failed', jobId: job.id, status: job.status });
+    }
+    if (!job.success || job.status !== 'done') {
+      return NextResponse.json(job);
+    }
+    // Finished jobs carry the same shape as a one-off run
+    return NextResponse.json({ ...job.result, jobId: job.id, status: job.status });
+  } catch (error) {
+    console.error('Worker error:', error);
+    return NextResponse.json({
+      success: false,
+      error: error instanceof Error ? error.message : 'Price scraper worker is not reachable'
+    });
+  }
+}
+
 export async function POST() {
   try {
     console.log('Starting price update...');
     
+    if (WORKER_URL) {
+      const job = await callWorker('/jobs', {
+        method: 'POST',
+        body: JSON.stringify({ type: 'catalogue' })
+      });
+      if (!job.success) {
+        return NextResponse.json(job);
+      }
+      return NextResponse.json({ success: true, jobId: job.id, status: job.status });
+    }
+    
     // Check if Python is available
     let pythonAvailable = false;
     try {
@@ -32,45 +158,45 @@ export async function POST() {
       });
     }
 
-    // Run the Python script with better error handling
-    const { stdout, stderr } = await execPromise('python src/lib/scraping/price_scraper.py', {
-      encoding: 'utf8',
-      maxBuffer: 1024 * 1024,
-      timeout: 60000 // 60 second timeout
-    });
-    
-    console.log('Python script stdout:', stdout);
-    console.log('Python script stderr:', stderr);
-    
+    // Run the Python script, streaming its NDJSON output. The budget keeps the run inside the
+    // 60 second timeout; products it does not reach are picked up by the next run.
+    const { results, summary, stderr, timedOut } = await runScraper(['--budget-seconds', '50', '--shard', '--leases', 'supabase'], 60000);
+
     // Check if stderr contains any errors
     if (stderr && stderr.trim()) {
       console.error('Python script stderr:', stderr);
     }
-    
-    // Check if stdout starts with HTML (error page)
-    if (stdout.trim().startsWith('<!DOCTYPE') || stdout.trim().startsWith('<html')) {
-      console.error('Python script returned HTML instead of JSON:', stdout.substring(0, 500));
-      return NextResponse.json({ 
-        success: false, 
-        error: 'Python script returned HTML error page instead of JSON',
-        details: stdout.substring(0, 1000)
-      });
+
+    if (summary) {
+      if (!summary.success) {
+        return NextResponse.json(summary);
+      }
+      return NextResponse.json({ success: true, results, ...summary });
     }
-    
-    try {
-      const cleanOutput = stdout.trim();
-      const result = JSON.parse(cleanOutput);
-      return NextResponse.json(result);
-    } catch (parseError) {
-      console.error('Parse error:', parseError);
-      console.error('Raw output:', stdout);
-      return NextResponse.json({ 
-        success: false, 
-        error: 'Failed to parse script output as JSON',
-        details: stdout.substring(0, 1000),
-        parseError: parseError instanceof Error ? parseError.message : 'Unknown parse error'
+
+    // The script was killed or crashed before its summary line; report what did finish
+    if (results.length === 0) {
+      return NextResponse.json({
+        success: false,
+        error: timedOut ? 'Price update timed out before any product finished' : 'Price update exited without output',
+        details: stderr.substring(0, 1000)
       });
     }
+
+    const updated = results.filter((result) => result.success).length;
+    const unchanged = results.filter((result) => result.unchanged).length;
+    return NextResponse.json({
+      success: true,
+      partial: true,
+      error: timedOut ? 'Price update timed out; returning the products that finished' : 'Price update exited early',
+      results,
+      summary: {
+        total: results.length,
+        updated,
+        unchanged,
+        failed: results.length - updated
+      }
+    });
   } catch (error) {
     console.error('Execution error:', error);
     return NextResponse.json({ 
@@ -40,6 +40,7 @@ export default function ProductPage({ params }: PageProps) {
             serving_size,
             image_url,
             price_per_kg,
+            protein_per_dollar,
             Kilojoules_per_serving,
             category,
             link,
@@ -103,7 +104,8 @@ export default function ProductPage({ params }: PageProps) {
                   <p>Protein per 100g: {product.protein_per_100g}g</p>
                   <p>Kilojoules per serving: {product.Kilojoules_per_serving}</p>
                   <p>Serving size: {product.serving_size}g</p>
-                  <p>Price per kg: ${product.price_per_kg?.toFixed(2)}</p>
+                  <p>Price per kg: {product.price_per_kg != null ? `$${product.price_per_kg.toFixed(2)}` : '—'}</p>
+                  <p>Protein per dollar: {product.protein_per_dollar != null ? `${product.protein_per_dollar.toFixed(1)}g` : '—'}</p>
                   <p>Category: {product.category}</p>
                 </div>
               </div>
@@ -3,6 +3,21 @@
 import { useState } from 'react'
 import supabase from '@/lib/supabase/client'
 
+// How often a queued worker job is polled for completion
+const POLL_INTERVAL_MS = 2000
+
+async function waitForJob(jobId: string, onProgress: (job: any) => void) {
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS))
+    const response = await fetch(`/api/update-prices?job=${encodeURIComponent(jobId)}`)
+    const job = await response.json()
+    if (!job.success || job.status === 'done' || job.status === 'failed') {
+      return job
+    }
+    onProgress(job)
+  }
+}
+
 export function PriceUpdateButton() {
   const [isUpdating, setIsUpdating] = useState(false)
   const [status, setStatus] = useState('')
@@ -20,7 +35,15 @@ export function PriceUpdateButton() {
         method: 'POST',
       })
 
-      const data = await response.json()
+      let data = await response.json()
+
+      // A resident scraper worker queues the update; poll until it finishes
+      if (data.success && data.jobId) {
+        setStatus('Price update queued...')
+        data = await waitForJob(data.jobId, job => {
+          setStatus(`Updating prices... ${job.progress?.processed ?? 0} products checked`)
+        })
+      }
       
       if (!data.success) {
         // Handle Python availability issues specially
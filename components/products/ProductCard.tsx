@@ -11,8 +11,8 @@ interface Product {
   protein_per_100g: number;
   serving_size: number;
   image_url: string;
-  price_per_kg: number;
-  protein_per_dollar: number;
+  price_per_kg: number | null;
+  protein_per_dollar: number | null;
   category: string;
 }
 
@@ -51,10 +51,10 @@ export default function ProductCard({ product }: ProductCardProps) {
           <div className="flex justify-between items-end">
             <div>
               <span className="text-2xl font-bold text-indigo-600">${product.price.toFixed(2)}</span>
-              <div className="text-xs text-gray-500">${product.price_per_kg.toFixed(2)}/kg</div>
+              <div className="text-xs text-gray-500">{product.price_per_kg != null ? `$${product.price_per_kg.toFixed(2)}/kg` : '—'}</div>
             </div>
             <div className="text-right">
-              <div className="text-sm font-medium text-green-600">{product.protein_per_dollar.toFixed(1)}g/$</div>
+              <div className="text-sm font-medium text-green-600">{product.protein_per_dollar != null ? `${product.protein_per_dollar.toFixed(1)}g/$` : '—'}</div>
               <div className="text-xs text-gray-500">protein per dollar</div>
             </div>
           </div>
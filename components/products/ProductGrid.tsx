@@ -79,7 +79,7 @@ export default function ProductGrid({ featured = false }: ProductGridProps) {
   // If featured is true, just show the first 3 products with highest protein per dollar
   const displayProducts = featured 
     ? [...products]
-        .sort((a, b) => b.protein_per_dollar - a.protein_per_dollar)
+        .sort((a, b) => (b.protein_per_dollar ?? 0) - (a.protein_per_dollar ?? 0))
         .slice(0, 3)
     : products;
 
@@ -13,7 +13,8 @@ interface Product {
   protein_per_100g: number
   serving_size: number
   image_url: string
-  price_per_kg: number
+  price_per_kg: number | null
+  protein_per_dollar: number | null
   Kilojoules_per_serving: number
   category: string
   link: string
@@ -28,6 +29,12 @@ interface ProductTableProps {
 
 type SortField = 'price' | 'protein_per_100g' | 'price_per_kg' | 'Kilojoules_per_serving' | 'protein_per_dollar' | 'kilojoules_per_100g' | 'kj_per_gram_protein'
 
+// The stored value, or worked out from the price per kg for rows the price scraper has not written
+const proteinPerDollar = (product: Product) => {
+  const value = product.protein_per_dollar ?? (product.protein_per_100g * 10) / product.price_per_kg
+  return Number.isFinite(value) ? value : null
+}
+
 export function ProductTable({ products, loading, error }: ProductTableProps) {
   const [sortField, setSortField] = useState<SortField>('price_per_kg')
   const [sortDirection, setSortDirection] = useState<'asc' | 'desc'>('asc')
@@ -69,11 +76,6 @@ export function ProductTable({ products, loading, error }: ProductTableProps) {
 
   const sortedProducts = [...products].sort((a, b) => {
     const multiplier = sortDirection === 'asc' ? 1 : -1
-    if (sortField === 'protein_per_dollar') {
-      const aValue = (a.protein_per_100g * 10) / a.price_per_kg
-      const bValue = (b.protein_per_100g * 10) / b.price_per_kg
-      return (aValue - bValue) * multiplier
-    }
     if (sortField === 'kilojoules_per_100g') {
       const aValue = (a.Kilojoules_per_serving / a.serving_size) * 100
       const bValue = (b.Kilojoules_per_serving / b.serving_size) * 100
@@ -86,6 +88,15 @@ export function ProductTable({ products, loading, error }: ProductTableProps) {
       const bValue = bKjPer100g / b.protein_per_100g
       return (aValue - bValue) * multiplier
     }
+    if (sortField === 'protein_per_dollar' || sortField === 'price_per_kg') {
+      const aValue = sortField === 'protein_per_dollar' ? proteinPerDollar(a) : a.price_per_kg
+      const bValue = sortField === 'protein_per_dollar' ? proteinPerDollar(b) : b.price_per_kg
+      // Products without a value go last in either direction
+      if (aValue == null || bValue == null) {
+        return (aValue == null ? 1 : 0) - (bValue == null ? 1 : 0)
+      }
+      return (aValue - bValue) * multiplier
+    }
     return (a[sortField] - b[sortField]) * multiplier
   })
 
@@ -176,9 +187,9 @@ export function ProductTable({ products, loading, error }: ProductTableProps) {
         </thead>
         <tbody className="bg-white divide-y divide-gray-200">
           {sortedProducts.map((product) => {
-            const proteinPerDollar = (product.protein_per_100g * 10) / product.price_per_kg
             const kilojoulesper100g = (product.Kilojoules_per_serving / product.serving_size) * 100
             const kjPerGramProtein = kilojoulesper100g / product.protein_per_100g
+            const productProteinPerDollar = proteinPerDollar(product)
             return (
             <tr 
               key={product.id} 
@@ -217,7 +228,7 @@ export function ProductTable({ products, loading, error }: ProductTableProps) {
               </td>
               <td className="px-1 md:px-3 py-2 md:py-4">
                 <div className="text-xs md:text-sm text-gray-900 break-words">${product.price.toFixed(2)}</div>
-                <div className="text-xs text-gray-500 break-words">${product.price_per_kg.toFixed(2)}/kg</div>
+                <div className="text-xs text-gray-500 break-words">{product.price_per_kg != null ? `$${product.price_per_kg.toFixed(2)}/kg` : '—'}</div>
               </td>
               <td className="px-1 md:px-6 py-2 md:py-4 text-xs md:text-sm text-gray-900 break-words">
                 {product.protein_per_100g}g
@@ -234,7 +245,7 @@ export function ProductTable({ products, loading, error }: ProductTableProps) {
               </td>
               <td className="px-1 md:px-3 py-2 md:py-4">
                 <div className="text-xs md:text-sm text-gray-900 break-words">
-                  {proteinPerDollar.toFixed(1)}g
+                  {productProteinPerDollar != null ? `${productProteinPerDollar.toFixed(1)}g` : '—'}
                 </div>
               </td>
               <td className="px-1 md:px-3 py-2 md:py-4">
@@ -31,11 +31,13 @@ export function useProducts() {
             serving_size,
             image_url,
             price_per_kg,
+            protein_per_dollar,
             Kilojoules_per_serving,
             category,
             link,
             is_natural
           `)
+          .order('price_per_kg', { ascending: true, nullsFirst: false })
 
         if (error) {
           console.error('useProducts: Supabase error:', error)
@@ -7,7 +7,8 @@ export interface Product {
   protein_per_100g: number
   serving_size: number
   image_url: string
-  price_per_kg: number
+  price_per_kg: number | null
+  protein_per_dollar: number | null
   Kilojoules_per_serving: number
   category: string
   link: string
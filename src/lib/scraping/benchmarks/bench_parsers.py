@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark retailer parsers on saved HTML fixtures.
+
+Compares a full-document BeautifulSoup parse against each parser's strained
+fast path, reporting the best parse+extract time and peak traced memory.
+
+    python src/lib/scraping/benchmarks/bench_parsers.py [--repeat 20] [retailer ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(SCRAPING_DIR, 'benchmarks', 'fixtures')
+sys.path.insert(0, SCRAPING_DIR)
+
+from retailers import get_parser  # noqa: E402
+
+
+def load_fixtures(names=None):
+    """Return {retailer: (url, expected price, html)} for the saved fixtures."""
+    with open(os.path.join(FIXTURES_DIR, 'index.json')) as f:
+        index = json.load(f)
+    fixtures = {}
+    for name, entry in index.items():
+        if names and name not in names:
+            continue
+        with open(os.path.join(FIXTURES_DIR, f'{name}.html'), encoding='utf-8') as f:
+            fixtures[name] = (entry['url'], entry['price'], f.read())
+    return fixtures
+
+
+def measure(fn, repeat):
+    """Return (best seconds, peak traced bytes, result) for fn()."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('retailers', nargs='*', help='limit to these fixtures')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per measurement')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    rows = []
+    for name, (url, expected, html) in load_fixtures(args.retailers).items():
+        retailer = get_parser(url)
+        full_time, full_peak, full = measure(lambda: retailer.extract(retailer.parse(html)), args.repeat)
+        fast_time, fast_peak, fast = measure(lambda: retailer.extract_html(html), args.repeat)
+        rows.append({
+            'retailer': name,
+            'bytes': len(html),
+            'full_ms': round(full_time * 1000, 2),
+            'fast_ms': round(fast_time * 1000, 2),
+            'full_peak_kb': round(full_peak / 1024, 1),
+            'fast_peak_kb': round(fast_peak / 1024, 1),
+            'step': fast[1],
+            'correct': full[0] is not None and fast[0] is not None and abs(fast[0] - expected) < 0.01,
+        })
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'retailer':22} {'KB':>6} {'full ms':>8} {'fast ms':>8} {'full KB':>8} {'fast KB':>8}  step")
+    for row in rows:
+        print(f"{row['retailer']:22} {row['bytes'] / 1024:6.0f} {row['full_ms']:8.2f} {row['fast_ms']:8.2f} "
+              f"{row['full_peak_kb']:8.0f} {row['fast_peak_kb']:8.0f}  {row['step']}{'' if row['correct'] else '  MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Benchmark a full scraper run offline against the replay server.
+
+Starts benchmarks/replay_server.py in this process, then runs the scraper's
+update in a fresh interpreter with HTTP_PROXY and the Supabase URL pointed at
+it. Reports throughput, per-retailer p50/p95/p99 scrape latency (each product
+page's fetches, variant pages and store API lookups plus extraction, excluding
+politeness waits) and the scraper's peak RSS (the main
+process only; --parse-workers processes are not included).
+
+    python src/lib/scraping/benchmarks/bench_scrape.py [--copies 20] [--latency 0.05 --jitter 0.02]
+        [--error-rate 0.02] [--throttle-rate 0.01] [--workers 8] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SCRAPING_DIR, 'benchmarks'))
+
+from replay_server import ReplayConfig, ReplayServer  # noqa: E402
+
+# Dummy service key; the replay server does not check it
+BENCH_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_child(options):
+    """Scraper side of the benchmark: run one update and print timings as JSON."""
+    import resource
+
+    sys.path.insert(0, SCRAPING_DIR)
+    import price_scraper
+    from http_client import HttpClient
+    from parse_pool import ParsePool
+    from retailers import module_for
+
+    price_scraper.http_client = HttpClient(retries=options['retries'], backoff=options['backoff'])
+    if options['parse_workers'] > 0:
+        price_scraper.parse_pool = ParsePool(workers=options['parse_workers'])
+    timings = []
+    scrape_group = price_scraper.scrape_group
+
+    def timed_group(group, timeout=price_scraper.REQUEST_TIMEOUT, metrics=None):
+        # Timed per page group, so variant pages and store API lookups are included; each
+        # product linking to the page gets the page's time
+        start = time.perf_counter()
+        prices = {}
+        try:
+            prices = scrape_group(group, timeout, metrics)
+            return prices
+        finally:
+            seconds = time.perf_counter() - start
+            retailer = module_for(group['url'])
+            for _, variant in group['products']:
+                price, _ = prices.get(variant, (None, None))
+                timings.append((retailer, seconds, price is not None))
+
+    price_scraper.scrape_group = timed_group
+    start = time.perf_counter()
+    result = price_scraper.update_product_prices(
+        max_workers=options['workers'],
+        per_host=options['per_host'],
+        host_delay=options['host_delay'],
+        state_dir=options['state_dir'],
+    )
+    if price_scraper.parse_pool is not None:
+        price_scraper.parse_pool.close()
+    print(json.dumps({
+        'elapsed': time.perf_counter() - start,
+        'timings': timings,
+        'summary': result.get('summary'),
+        'http': result.get('http'),
+        'error': result.get('error'),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+def run_benchmark(args):
+    config = ReplayConfig(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    server = ReplayServer(config=config, copies=args.copies, api=not args.no_api).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            options = {
+                'workers': args.workers,
+                'per_host': args.per_host,
+                'host_delay': args.host_delay,
+                'retries': args.retries,
+                'backoff': args.backoff,
+                'parse_workers': args.parse_workers,
+                'state_dir': os.path.join(workdir, 'state'),
+            }
+            env = dict(
+                os.environ,
+                NEXT_PUBLIC_SUPABASE_URL=server.url,
+                SUPABASE_SERVICE_ROLE_KEY=BENCH_KEY,
+                HTTP_PROXY=server.url,
+                http_proxy=server.url,
+                NO_PROXY='127.0.0.1,localhost',
+                no_proxy='127.0.0.1,localhost',
+            )
+            # Run from an empty directory so no real .env.local is picked up
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', json.dumps(options)],
+                cwd=workdir, env=env, capture_output=True, text=True,
+            )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip() or 'scraper run failed')
+        child = json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        server.stop()
+    if child['error']:
+        raise RuntimeError(child['error'])
+
+    by_retailer = {}
+    for retailer, seconds, found in child['timings']:
+        by_retailer.setdefault(retailer, []).append((seconds, found))
+    retailers = []
+    for retailer, samples in sorted(by_retailer.items()):
+        latencies = [seconds * 1000 for seconds, _ in samples]
+        retailers.append({
+            'retailer': retailer,
+            'products': len(samples),
+            'failed': sum(1 for _, found in samples if not found),
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+        })
+    # The run's own count, which also covers any product it reported without scraping
+    products = (child['summary'] or {}).get('total', len(child['timings']))
+    return {
+        'products': products,
+        'seconds': round(child['elapsed'], 3),
+        'throughput': round(products / child['elapsed'], 2) if child['elapsed'] else None,
+        'peak_rss_mb': round(child['peak_rss_kb'] / 1024, 1),
+        'summary': child['summary'],
+        'http': child['http'],
+        'server': dict(server.counts, writes=len(server.writes)),
+        'retailers': retailers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--copies', type=int, default=10, help='product rows per fixture')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every page response')
+    parser.add_argument('--jitter', type=float, default=0.02, help='random +/- seconds around the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of page requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of page requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--seed', type=int, default=1, help='seed for reproducible faults')
+    parser.add_argument('--workers', type=int, default=8, help='scraper --workers')
+    parser.add_argument('--per-host', type=int, default=2, help='scraper --per-host')
+    parser.add_argument('--host-delay', type=float, default=0.0, help='scraper --host-delay')
+    parser.add_argument('--retries', type=int, default=3, help='scraper --retries')
+    parser.add_argument('--backoff', type=float, default=0.1, help='scraper --backoff')
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1,
+                        help='scraper --parse-workers (0 parses on the fetch threads)')
+    parser.add_argument('--no-api', action='store_true', help='make stores answer 404 for their JSON endpoints')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(json.loads(args.child))
+
+    report = run_benchmark(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    summary = report['summary'] or {}
+    print(f"{report['products']} products in {report['seconds']:.2f}s "
+          f"({report['throughput']} products/s), peak RSS {report['peak_rss_mb']} MB")
+    print(f"updated {summary.get('updated')}, failed {summary.get('failed')}; server {report['server']}")
+    print(f"{'retailer':22} {'n':>5} {'failed':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in report['retailers']:
+        print(f"{row['retailer']:22} {row['products']:5} {row['failed']:6} "
+              f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
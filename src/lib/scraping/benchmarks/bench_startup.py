@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark scraper cold-start time in fresh interpreters.
+
+Each scenario runs in a new python process, so the timings include every
+import it triggers. The report shows the median wall time and which heavy
+dependencies ended up loaded.
+
+    python src/lib/scraping/benchmarks/bench_startup.py [--repeat 10] [scenario ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(SCRAPING_DIR, 'benchmarks', 'fixtures')
+
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'lxml', 'supabase', 'dotenv', 'http.server')
+
+# Each snippet runs after SCRAPING_DIR is put on sys.path
+SCENARIOS = {
+    'interpreter': 'pass',
+    'import': 'import price_scraper',
+    'parse_fixture': (
+        'import json, os\n'
+        'import price_scraper\n'
+        f'fixtures = {FIXTURES_DIR!r}\n'
+        "entry = json.load(open(os.path.join(fixtures, 'index.json')))['myprotein']\n"
+        "html = open(os.path.join(fixtures, 'myprotein.html'), encoding='utf-8').read()\n"
+        "assert price_scraper.extract_price(entry['url'], html) is not None"
+    ),
+    'supabase_client': 'import price_scraper\nprice_scraper.get_supabase()',
+}
+
+PROBE = (
+    'import sys, json\n'
+    'sys.path.insert(0, {path!r})\n'
+    '{body}\n'
+    'print(json.dumps([m for m in {heavy!r} if m in sys.modules]))\n'
+)
+
+# Dummy credentials so creating the client does not need a real project
+DUMMY_ENV = {
+    'NEXT_PUBLIC_SUPABASE_URL': 'http://127.0.0.1:54321',
+    'SUPABASE_SERVICE_ROLE_KEY': 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench',
+}
+
+
+def run_scenario(body, repeat):
+    """Return (median ms, loaded heavy modules) over repeat fresh interpreters."""
+    code = PROBE.format(path=SCRAPING_DIR, body=body, heavy=HEAVY_MODULES)
+    env = dict(os.environ, **DUMMY_ENV)
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return statistics.median(timings) * 1000, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', help=f"limit to these ({', '.join(SCENARIOS)})")
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreters per scenario')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    rows = []
+    for name, body in SCENARIOS.items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        try:
+            median_ms, loaded = run_scenario(body, args.repeat)
+            rows.append({'scenario': name, 'median_ms': round(median_ms, 1), 'loaded': loaded})
+        except Exception as e:
+            rows.append({'scenario': name, 'median_ms': None, 'loaded': [], 'error': str(e)})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'scenario':18} {'median ms':>10}  loaded")
+    for row in rows:
+        if row['median_ms'] is None:
+            print(f"{row['scenario']:18} {'-':>10}  error: {row['error']}")
+        else:
+            print(f"{row['scenario']:18} {row['median_ms']:10.1f}  {', '.join(row['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Local stand-in for retailer sites and Supabase, serving the saved fixtures.
+
+Retailer pages are served as a plain HTTP forward proxy: point HTTP_PROXY at
+the server and request http:// product links, and each fixture is replayed
+with configurable latency, jitter, 5xx errors and 429s. Shopify and
+WooCommerce product JSON from fixtures/api/ is replayed the same way. The same server
+answers the PostgREST calls the scraper makes (the products select and the
+bulk_update_prices RPC), so a whole run works without network access.
+
+    python src/lib/scraping/benchmarks/replay_server.py [--port 8765] [--latency 0.05] [--error-rate 0.02]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, parse_qsl, urlencode
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+DEFAULT_PORT = 8765
+
+
+def load_pages(fixtures_dir=FIXTURES_DIR):
+    """Return ({host+path: html bytes}, {module: fixture index entry})."""
+    with open(os.path.join(fixtures_dir, 'index.json')) as f:
+        index = json.load(f)
+    pages = {}
+    for name, entry in index.items():
+        parts = urlsplit(entry['url'])
+        with open(os.path.join(fixtures_dir, f'{name}.html'), 'rb') as f:
+            pages[parts.netloc + parts.path] = f.read()
+    return pages, index
+
+
+def api_key(netloc, path, query=''):
+    """Key for a store API response: host, path and the query with its parameters sorted."""
+    return netloc + path + ('?' + urlencode(sorted(parse_qsl(query))) if query else '')
+
+
+def load_api_responses(fixtures_dir=FIXTURES_DIR):
+    """Return {api_key: JSON bytes} for the store API fixtures."""
+    api_dir = os.path.join(fixtures_dir, 'api')
+    if not os.path.isdir(api_dir):
+        return {}
+    with open(os.path.join(api_dir, 'index.json')) as f:
+        index = json.load(f)
+    responses = {}
+    for key, filename in index.items():
+        with open(os.path.join(api_dir, filename), 'rb') as f:
+            responses[key] = f.read()
+    return responses
+
+
+def make_catalogue(index, copies=1):
+    """Return product rows linking to every fixture, copies times over.
+
+    Links use http:// so requests go through the proxy in clear text; copies
+    after the first carry a distinct (non-tracking) query string, so the
+    scraper fetches each one as a separate page.
+    """
+    products = []
+    for i, (name, entry) in enumerate(sorted(index.items())):
+        for k in range(copies):
+            link = 'http://' + entry['url'].split('://', 1)[1]
+            if k:
+                link += f'?copy={k}'
+            products.append({'id': str(uuid.UUID(int=i * 100000 + k + 1)), 'link': link, 'price': None})
+    return products
+
+
+class ReplayConfig:
+    """Fault and latency settings applied to every replayed page."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=None):
+        self.latency = max(0.0, latency)
+        self.jitter = max(0.0, jitter)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay seconds, status) for one page request."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            status = 429
+        elif roll < self.throttle_rate + self.error_rate:
+            status = 503
+        else:
+            status = 200
+        return max(0.0, delay), status
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Ignores clients that hang up mid-response, as the scraper does once it has seen a price."""
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class ReplayServer:
+    """Threaded server replaying fixtures and faking the PostgREST endpoints."""
+
+    def __init__(self, host='127.0.0.1', port=0, config=None, copies=1, fixtures_dir=FIXTURES_DIR, api=True):
+        self.config = config or ReplayConfig()
+        self.pages, self.index = load_pages(fixtures_dir)
+        # Without api, stores answer 404 for their JSON endpoints, as when an API is disabled
+        self.api_responses = load_api_responses(fixtures_dir) if api else {}
+        self.products = make_catalogue(self.index, copies)
+        self.writes = []
+        self.counts = {'pages': 0, 'errors': 0, 'throttled': 0, 'missing': 0}
+        self._lock = threading.Lock()
+        self.httpd = QuietHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def select_products(self, query):
+        """Apply the PostgREST filters, ordering and limit the scraper uses to the fake catalogue."""
+        rows = self.products
+        params = parse_qs(query)
+        match = re.fullmatch(r'in\.\((.*)\)', (params.get('id') or [''])[0])
+        if match:
+            wanted = {value.strip('"') for value in match.group(1).split(',')}
+            rows = [row for row in rows if row['id'] in wanted]
+        # Keyset pagination: order=id.asc&id=gt.<last id>&limit=<page size>
+        match = re.fullmatch(r'gt\.(.*)', (params.get('id') or [''])[0])
+        if match:
+            rows = [row for row in rows if row['id'] > match.group(1)]
+        if (params.get('order') or [''])[0].startswith('id'):
+            rows = sorted(rows, key=lambda row: row['id'], reverse='.desc' in params['order'][0])
+        if params.get('limit'):
+            rows = rows[:int(params['limit'][0])]
+        columns = (params.get('select') or ['*'])[0]
+        if columns != '*':
+            names = columns.split(',')
+            rows = [{name: row.get(name) for name in names} for row in rows]
+        return rows
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self):
+                return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            def _page(self, parts):
+                delay, status = server.config.draw()
+                if delay:
+                    time.sleep(delay)
+                if status == 429:
+                    server._count('throttled')
+                    return self._send(429, b'Too Many Requests', 'text/plain',
+                                      {'Retry-After': str(server.config.retry_after)})
+                if status != 200:
+                    server._count('errors')
+                    return self._send(status, b'Service Unavailable', 'text/plain')
+                body = server.api_responses.get(api_key(parts.netloc, parts.path, parts.query))
+                if body is not None:
+                    server._count('pages')
+                    return self._send(200, body)
+                body = server.pages.get(parts.netloc + parts.path)
+                if body is None:
+                    server._count('missing')
+                    return self._send(404, b'Not Found', 'text/plain')
+                server._count('pages')
+                self._send(200, body, 'text/html; charset=utf-8')
+
+            def do_GET(self):
+                # postgrest-py sends a JSON body even on GET; drain it to keep the connection usable
+                self._read_body()
+                parts = urlsplit(self.path)
+                if parts.netloc:
+                    return self._page(parts)
+                if parts.path == '/rest/v1/products':
+                    return self._send(200, json.dumps(server.select_products(parts.query)).encode('utf-8'))
+                self._send(404, b'{}')
+
+            def do_POST(self):
+                try:
+                    body = json.loads(self._read_body() or b'{}')
+                except ValueError:
+                    return self._send(400, b'{}')
+                if urlsplit(self.path).path == '/rest/v1/rpc/bulk_update_prices':
+                    updates = body.get('updates') or []
+                    with server._lock:
+                        server.writes.extend(updates)
+                    return self._send(200, json.dumps([{'id': u['id']} for u in updates]).encode('utf-8'))
+                self._send(404, b'{}')
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--copies', type=int, default=1, help='product rows per fixture')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every page response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random +/- seconds around the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of page requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of page requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--seed', type=int, help='seed for reproducible faults')
+    parser.add_argument('--no-api', action='store_true', help='answer 404 for Shopify/WooCommerce JSON endpoints')
+    args = parser.parse_args()
+
+    config = ReplayConfig(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    server = ReplayServer(args.host, args.port, config, args.copies, api=not args.no_api)
+    sys.stderr.write(f'Replaying {len(server.pages)} fixtures ({len(server.products)} products) on {server.url}\n'
+                     f'  NEXT_PUBLIC_SUPABASE_URL={server.url} HTTP_PROXY={server.url} NO_PROXY={args.host}\n')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
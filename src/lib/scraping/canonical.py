@@ -0,0 +1,85 @@
+# src/lib/scraping/canonical.py
+"""Product link canonicalisation, so rows that share a page are fetched once per run.
+
+Links are compared after dropping tracking parameters and fragments, lowercasing
+the host and ignoring a leading www, a default port and a trailing slash.
+Variant selectors (Shopify's ?variant=, WooCommerce's attribute_* parameters)
+are kept apart from the page itself: rows for different variants of one
+product share a page, and the scraper prices each variant from it.
+"""
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters added by ad platforms, mailing lists and affiliate links
+TRACKING_PARAMS = {
+    '_ga', '_gl', 'dclid', 'fbclid', 'gbraid', 'gclid', 'gclsrc', 'igshid', 'mc_cid', 'mc_eid',
+    'msclkid', 'ref', 'ref_', 'srsltid', 'tag', 'wbraid', 'yclid',
+    # Shopify search and recommendation tracking
+    '_pos', '_psq', '_sid', '_ss', 'pr_prod_strat', 'pr_rec_id', 'pr_rec_pid', 'pr_ref_pid', 'pr_seq',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Query parameters that pick a variant of the product on the page
+VARIANT_PARAMS = {'variant'}
+VARIANT_PREFIXES = ('attribute_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _is_variant(name):
+    name = name.lower()
+    return name in VARIANT_PARAMS or name.startswith(VARIANT_PREFIXES)
+
+
+def canonical_url(url):
+    """Return url without tracking parameters or fragment, with a lowercase host and sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k))
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def variant_params(url):
+    """Return the variant selectors in url's query as a sorted tuple of (name, value)."""
+    return tuple(sorted((k, v) for k, v in parse_qsl(urlsplit(url).query) if _is_variant(k)))
+
+
+def page_url(url):
+    """Return the canonical URL of the page itself, without variant selectors."""
+    parts = urlsplit(canonical_url(url))
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_variant(k)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def page_key(url):
+    """Return a key that is equal for every link to the same page."""
+    parts = urlsplit(page_url(url))
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return (parts.scheme, host, parts.path.rstrip('/') or '/', parts.query)
+
+
+def group_pages(products, link=lambda product: product['link']):
+    """Group products by the page their link points at, in first-seen order.
+
+    Returns a list of {'url', 'variants', 'products'} dicts: 'url' is the page
+    to fetch, 'variants' maps each variant selector seen to a canonical link
+    for it, and 'products' pairs every product with its variant selector.
+    """
+    groups = OrderedDict()
+    for product in products:
+        url = link(product)
+        group = groups.get(page_key(url))
+        if group is None:
+            group = groups[page_key(url)] = {'url': page_url(url), 'variants': OrderedDict(), 'products': []}
+        variant = variant_params(url)
+        group['variants'].setdefault(variant, canonical_url(url))
+        group['products'].append((product, variant))
+    return list(groups.values())
@@ -0,0 +1,59 @@
+# src/lib/scraping/catalogue.py
+"""Streaming reads of the Supabase products table, one keyset-paginated page at a time."""
+from fetch_pool import host_key
+
+# Product rows requested from Supabase per round-trip
+DEFAULT_PAGE_SIZE = 1000
+
+# Link to scrape, the values compared before writing, and what normalisation reads
+COLUMNS = 'id,link,price,price_per_kg,protein_per_dollar,name,weight,protein_per_100g'
+
+
+def iter_catalogue(client, page_size=DEFAULT_PAGE_SIZE, product_ids=None, hosts=None, columns=COLUMNS):
+    """Yield lists of product rows that have a link, at most page_size rows each, in id order.
+
+    Pages are read with keyset pagination (id greater than the last id seen)
+    rather than offsets, so every request is an index range scan however deep
+    into the table it reaches, and rows added or deleted mid-run cannot shift
+    later pages. Only an empty page ends the read, because PostgREST may cap a
+    page below page_size. product_ids limits the read to those products,
+    requested page_size ids at a time. hosts limits it to products linking to
+    those retailer hosts, as fetch_pool.host_key names them.
+    """
+    page_size = max(1, int(page_size))
+    hosts = set(hosts) if hosts is not None else None
+
+    def wanted(rows):
+        return [row for row in rows or [] if row.get('link') and (hosts is None or host_key(row['link']) in hosts)]
+
+    def select():
+        query = client.table('products').select(columns)
+        if hosts is not None and len(hosts) == 1:
+            # Narrows the read; wanted() drops links that merely mention the host
+            query = query.ilike('link', f'%{next(iter(hosts))}/%')
+        return query
+
+    if product_ids is not None:
+        ids = list(product_ids)
+        for start in range(0, len(ids), page_size):
+            yield wanted(select().in_('id', ids[start:start + page_size]).execute().data)
+        return
+
+    last_id = None
+    while True:
+        query = select().order('id').limit(page_size)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.execute().data
+        if not rows:
+            return
+        last_id = rows[-1]['id']
+        yield wanted(rows)
+
+
+def catalogue_hosts(client, page_size=DEFAULT_PAGE_SIZE):
+    """Return the sorted retailer hosts the catalogue's product links point at."""
+    hosts = set()
+    for page in iter_catalogue(client, page_size, columns='id,link'):
+        hosts.update(host_key(row['link']) for row in page)
+    return sorted(hosts)
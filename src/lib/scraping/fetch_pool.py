@@ -0,0 +1,159 @@
+# src/lib/scraping/fetch_pool.py
+"""Bounded thread pool with per-retailer concurrency caps and politeness delays."""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from itertools import islice
+from urllib.parse import urlsplit
+
+# Global cap on requests in flight across every retailer
+DEFAULT_MAX_WORKERS = 8
+
+# Defaults applied to each retailer host
+DEFAULT_PER_HOST = 2
+DEFAULT_HOST_DELAY = 1.0
+
+# Items read ahead and spread across hosts at a time, so streamed catalogues stay bounded
+INTERLEAVE_WINDOW = 1000
+
+# Retailers that block aggressive clients get at most one connection and at least a 2 second gap
+HOST_OVERRIDES = {
+    'coles.com.au': {'max_concurrent': 1, 'min_delay': 2.0},
+    'amazon.com.au': {'max_concurrent': 1, 'min_delay': 2.0},
+    'amazon.com': {'max_concurrent': 1, 'min_delay': 2.0},
+}
+
+
+class DeadlineExceeded(Exception):
+    """Raised for work that was still waiting for a host slot when the deadline passed."""
+
+
+def host_key(url):
+    """Return the lowercased hostname of a URL without a leading www."""
+    host = (urlsplit(url).hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+class HostLimiter:
+    """Caps concurrent requests and spaces out request starts for each host."""
+
+    def __init__(self, max_concurrent=DEFAULT_PER_HOST, min_delay=DEFAULT_HOST_DELAY, overrides=None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.min_delay = max(0.0, float(min_delay))
+        self.overrides = HOST_OVERRIDES if overrides is None else overrides
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    def limits(self, host):
+        """Return (max_concurrent, min_delay) for a host, honouring suffix overrides.
+
+        An override only tightens the limiter's own limits, never loosens them.
+        """
+        labels = host.split('.')
+        for i in range(len(labels) - 1):
+            override = self.overrides.get('.'.join(labels[i:]))
+            if override:
+                return (
+                    max(1, min(self.max_concurrent, int(override.get('max_concurrent', self.max_concurrent)))),
+                    max(self.min_delay, float(override.get('min_delay', self.min_delay))),
+                )
+        return self.max_concurrent, self.min_delay
+
+    def _semaphore(self, host):
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limits(host)[0])
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, url):
+        """Hold a request slot for the URL's host, waiting out its minimum delay."""
+        host = host_key(url)
+        _, min_delay = self.limits(host)
+        with self._semaphore(host):
+            # Reserve the next start time under the lock, then sleep outside it
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + min_delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def interleave_by_host(items, url_of, window=INTERLEAVE_WINDOW):
+    """Order items round-robin across hosts so one retailer cannot occupy every worker.
+
+    Items are consumed window at a time, so an iterator of any length is never
+    held in memory all at once.
+    """
+    items = iter(items)
+    while True:
+        buckets = OrderedDict()
+        for item in islice(items, window):
+            buckets.setdefault(host_key(url_of(item)), []).append(item)
+        if not buckets:
+            return
+        queues = [iter(bucket) for bucket in buckets.values()]
+        while queues:
+            remaining = []
+            for queue in queues:
+                item = next(queue, None)
+                if item is not None:
+                    yield item
+                    remaining.append(queue)
+            queues = remaining
+
+
+def run_concurrently(fn, items, url_of, max_workers=DEFAULT_MAX_WORKERS, limiter=None, deadline=None):
+    """Call fn(item) for every item and yield (item, result, error) as each completes.
+
+    At most max_workers calls run at once, and each host is additionally held to
+    the limiter's concurrency cap and minimum delay between request starts. When
+    a time.monotonic() deadline is given, no new calls start after it passes;
+    items that never started are simply not yielded. items may be a generator;
+    it is only read as fast as calls are started.
+    """
+    limiter = limiter or HostLimiter()
+
+    def task(item):
+        url = url_of(item)
+        with limiter.slot(url):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded(url)
+            return fn(item)
+
+    pending = {}
+    ordered = interleave_by_host(items, url_of)
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        # Keep the queue short so memory stays bounded for large catalogues
+        for item in ordered:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            pending[executor.submit(task, item)] = item
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _completed(pending.pop(future), future)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from _completed(pending.pop(future), future)
+
+
+def _completed(item, future):
+    error = future.exception()
+    if isinstance(error, DeadlineExceeded):
+        # Queued behind a host's rate limit when time ran out; leave it for the next run
+        return
+    if error is not None:
+        yield item, None, error
+    else:
+        yield item, future.result(), None
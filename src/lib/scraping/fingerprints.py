@@ -0,0 +1,55 @@
+# src/lib/scraping/fingerprints.py
+"""Per-page hashes of the markup a price was extracted from, so unchanged pages skip extraction."""
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# A fingerprint older than this is ignored, so every page is fully extracted at least daily
+DEFAULT_MAX_AGE = 24 * 3600
+
+Fingerprint = namedtuple('Fingerprint', 'url digest price step extracted_at')
+
+
+class PriceFingerprints:
+    """SQLite store of the last price-region hash, price and extraction step for each product URL."""
+
+    def __init__(self, state_dir, max_age=DEFAULT_MAX_AGE):
+        os.makedirs(state_dir, exist_ok=True)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(state_dir, 'fingerprints.sqlite3'), check_same_thread=False)
+        self._db.execute('''
+            create table if not exists fingerprints (
+                url text primary key,
+                digest text not null,
+                price real not null,
+                step text not null,
+                extracted_at real not null
+            )
+        ''')
+        self._db.commit()
+
+    def get(self, url):
+        """Return the stored Fingerprint for url, or None if missing or older than max_age."""
+        with self._lock:
+            row = self._db.execute(
+                'select digest, price, step, extracted_at from fingerprints where url = ?', (url,)
+            ).fetchone()
+        if row is None or time.time() - row[3] > self.max_age:
+            return None
+        return Fingerprint(url, *row)
+
+    def put(self, url, digest, price, step):
+        """Store the fingerprint of a page whose price was just extracted."""
+        with self._lock:
+            self._db.execute(
+                'insert or replace into fingerprints (url, digest, price, step, extracted_at) values (?, ?, ?, ?, ?)',
+                (url, digest, price, step, time.time()),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
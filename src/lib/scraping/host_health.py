@@ -0,0 +1,90 @@
+# src/lib/scraping/host_health.py
+"""Per-host circuit breaker and latency-derived request timeouts."""
+import threading
+import time
+from collections import deque
+
+# Consecutive failed requests (errors, timeouts, 429/5xx after retries) that open a host's circuit
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# Seconds an open circuit short-circuits a host before one probe request is let through
+DEFAULT_COOLDOWN = 120
+
+# Seconds allowed to open a connection; a reachable retailer answers well within this
+CONNECT_TIMEOUT = 5
+
+# Read timeouts are TIMEOUT_FACTOR times a host's recent p95 response time, within these bounds
+MIN_READ_TIMEOUT = 5
+TIMEOUT_FACTOR = 4
+# Response times kept per host, and how many are needed before they replace the default
+LATENCY_SAMPLES = 50
+MIN_SAMPLES = 5
+
+
+class HostUnavailable(Exception):
+    """Raised instead of requesting a host whose circuit is open."""
+
+    def __init__(self, host):
+        super().__init__('Host unavailable')
+        self.host = host
+
+
+class HostHealth:
+    """Tracks failures and response times per host, shared by every fetch thread."""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = max(0.0, float(cooldown))
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._open_until = {}
+        self._probing = set()
+        self._latencies = {}
+
+    def allow(self, host):
+        """Return False while host's circuit is open; after the cooldown, admit a single probe."""
+        with self._lock:
+            open_until = self._open_until.get(host)
+            if open_until is None:
+                return True
+            if time.monotonic() < open_until or host in self._probing:
+                return False
+            self._probing.add(host)
+            return True
+
+    def success(self, host, seconds):
+        """Record a response from host (any status below 429) that took seconds to arrive."""
+        with self._lock:
+            self._failures.pop(host, None)
+            self._open_until.pop(host, None)
+            self._probing.discard(host)
+            samples = self._latencies.get(host)
+            if samples is None:
+                samples = self._latencies[host] = deque(maxlen=LATENCY_SAMPLES)
+            samples.append(seconds)
+
+    def failure(self, host):
+        """Record a failed request; enough in a row (or a failed probe) opens the circuit."""
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.failure_threshold or host in self._probing:
+                self._open_until[host] = time.monotonic() + self.cooldown
+                self._probing.discard(host)
+
+    def timeout(self, host, default):
+        """Return a (connect, read) timeout for host, no longer than default."""
+        read = default
+        with self._lock:
+            samples = list(self._latencies.get(host) or ())
+        if len(samples) >= MIN_SAMPLES:
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            read = min(default, max(MIN_READ_TIMEOUT, p95 * TIMEOUT_FACTOR))
+        return min(CONNECT_TIMEOUT, default), read
+
+    def open_hosts(self):
+        """Return the hosts whose circuit is currently open."""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(host for host, until in self._open_until.items() if until > now)
@@ -0,0 +1,109 @@
+# src/lib/scraping/http_cache.py
+"""Persistent conditional-GET cache for retailer pages, backed by SQLite."""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'price-scraper')
+
+# Entries that have not been fetched or revalidated for this long are dropped
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Total compressed body size kept before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+CacheEntry = namedtuple('CacheEntry', 'url etag last_modified body price validated_at')
+
+
+class HttpCache:
+    """Stores page bodies with their validators and the price last extracted from them."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'http_cache.sqlite3'), check_same_thread=False)
+        self._db.execute('''
+            create table if not exists pages (
+                url text primary key,
+                etag text,
+                last_modified text,
+                body blob not null,
+                size integer not null,
+                price real,
+                validated_at real not null,
+                last_used real not null
+            )
+        ''')
+        self._db.execute('create index if not exists pages_last_used_idx on pages (last_used)')
+        self._db.commit()
+
+    def get(self, url):
+        """Return the cached entry for url, or None if missing or past its TTL."""
+        with self._lock:
+            row = self._db.execute(
+                'select etag, last_modified, body, price, validated_at from pages where url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body, price, validated_at = row
+        if time.time() - validated_at > self.ttl:
+            return None
+        return CacheEntry(url, etag, last_modified, zlib.decompress(body).decode('utf-8'), price, validated_at)
+
+    @staticmethod
+    def validators(entry):
+        """Return the conditional request headers for a cached entry."""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def put(self, url, etag, last_modified, body, price):
+        """Store a freshly downloaded page. Pages without validators are not cached."""
+        if not etag and not last_modified:
+            return
+        compressed = zlib.compress(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'insert or replace into pages (url, etag, last_modified, body, size, price, validated_at, last_used) '
+                'values (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, compressed, len(compressed), price, now, now),
+            )
+            self._db.commit()
+
+    def revalidated(self, url, price):
+        """Record a 304 response, refreshing the entry's TTL and stored price."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'update pages set price = ?, validated_at = ?, last_used = ? where url = ?',
+                (price, now, now, url),
+            )
+            self._db.commit()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        with self._lock:
+            self._db.execute('delete from pages where validated_at < ?', (time.time() - self.ttl,))
+            total = self._db.execute('select coalesce(sum(size), 0) from pages').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                for url, size in self._db.execute('select url, size from pages order by last_used').fetchall():
+                    if excess <= 0:
+                        break
+                    self._db.execute('delete from pages where url = ?', (url,))
+                    excess -= size
+            self._db.commit()
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._db.close()
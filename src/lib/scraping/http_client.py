@@ -0,0 +1,201 @@
+# src/lib/scraping/http_client.py
+"""Shared HTTP client for retailer fetches with per-host pooled sessions and retries."""
+import functools
+import threading
+import time
+
+from fetch_pool import host_key
+
+# requests and urllib3 are imported when the first session is created
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Connection': 'keep-alive',
+}
+
+# Keep-alive connections kept open per retailer host
+DEFAULT_POOL_SIZE = 4
+
+# Retries for 429/5xx responses and dropped connections, with exponential backoff
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bytes read at a time when a download may stop early
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Each new chunk is searched from this far back, so a stop marker split across chunks is still found
+MARKER_OVERLAP = 4096
+
+
+# Longest Retry-After a retailer can make us sleep for
+MAX_RETRY_AFTER = 30
+
+
+@functools.lru_cache(maxsize=None)
+def polite_retry_class():
+    """Return a urllib3 Retry that honours Retry-After, capped at MAX_RETRY_AFTER."""
+    from urllib3.util.retry import Retry
+
+    class PoliteRetry(Retry):
+        def get_retry_after(self, response):
+            retry_after = super().get_retry_after(response)
+            if retry_after is None:
+                return None
+            return min(retry_after, MAX_RETRY_AFTER)
+
+    return PoliteRetry
+
+
+# Seconds spent opening connections (DNS, TCP and TLS) on each thread since the last pop
+_connect_time = threading.local()
+
+
+def pop_connect_seconds():
+    """Return and reset the connection setup time accumulated on this thread."""
+    seconds = getattr(_connect_time, 'seconds', 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+@functools.lru_cache(maxsize=None)
+def timed_adapter_class():
+    """Return an HTTPAdapter whose connections add their setup time to pop_connect_seconds()."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(connection_class):
+        class TimedConnection(connection_class):
+            def connect(self):
+                start = time.perf_counter()
+                try:
+                    super().connect()
+                finally:
+                    _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    pool_classes = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+    class TimedAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+        def proxy_manager_for(self, proxy, **proxy_kwargs):
+            manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+            if not proxy.lower().startswith('socks'):
+                manager.pool_classes_by_scheme = pool_classes
+            return manager
+
+    return TimedAdapter
+
+
+def read_until(response, max_bytes=None, stop_marker=None):
+    """Read a streamed response body until max_bytes, or until stop_marker has matched.
+
+    Returns (body bytes, truncated). A truncated response is closed, since its
+    connection cannot go back to the pool with unread data on it.
+    """
+    body = bytearray()
+    truncated = False
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        searched = max(0, len(body) - MARKER_OVERLAP)
+        body += chunk
+        if stop_marker is not None and stop_marker.search(body, searched):
+            truncated = True
+            break
+        if max_bytes is not None and len(body) >= max_bytes:
+            del body[max_bytes:]
+            truncated = True
+            break
+    if truncated:
+        response.close()
+    return bytes(body), truncated
+
+
+class HttpClient:
+    """Hands out one pooled requests.Session per retailer host."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, headers=None):
+        self.pool_size = max(1, int(pool_size))
+        self.retries = max(0, int(retries))
+        self.backoff = max(0.0, float(backoff))
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        import requests
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        retry = polite_retry_class()(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            backoff_jitter=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # A couple of pools per session covers redirects between www and bare hosts
+        adapter = timed_adapter_class()(pool_connections=2, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        # Advertise every encoding urllib3 can decode here (gzip/deflate, plus br/zstd when installed)
+        session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        session.headers.update(self.headers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session(self, url):
+        """Return the shared session for url's host, creating it on first use."""
+        host = host_key(url)
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = self._new_session()
+        return session
+
+    def get(self, url, headers=None, timeout=30, **kwargs):
+        return self.session(url).get(url, headers=headers, timeout=timeout, **kwargs)
+
+    def stats(self):
+        """Return request and connection counts with the keep-alive reuse ratio."""
+        requests_made = 0
+        connections = 0
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            # Both schemes share one adapter, so count each adapter once
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                # Requests sent through HTTP_PROXY/HTTPS_PROXY use the adapter's proxy managers
+                for manager in [adapter.poolmanager, *adapter.proxy_manager.values()]:
+                    for pool_key in list(manager.pools.keys()):
+                        pool = manager.pools.get(pool_key)
+                        if pool is not None:
+                            requests_made += pool.num_requests
+                            connections += pool.num_connections
+        reuse_ratio = 1 - connections / requests_made if requests_made else 0.0
+        return {
+            'hosts': len(sessions),
+            'requests': requests_made,
+            'connections': connections,
+            'reuse_ratio': round(reuse_ratio, 3),
+        }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
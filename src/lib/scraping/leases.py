@@ -0,0 +1,207 @@
+# src/lib/scraping/leases.py
+"""Time-limited leases that let several scraper workers split a run by retailer host.
+
+A sharded run is identified by a round name. Within a round each shard (a
+retailer host) is leased by one worker at a time and marked finished when that
+worker is done, so no two workers scrape the same host and a finished host is
+not scraped again in that round. A worker renews its lease while it works; if
+it dies, the lease expires and another worker claims the host.
+
+SqliteLeases keeps the leases in a file shared by workers on one machine;
+SupabaseLeases keeps them in the scrape_leases table for workers anywhere.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# Seconds a lease lasts without being renewed
+DEFAULT_LEASE_TTL = 300
+
+# Share of the lease's lifetime between renewals, so a slow renewal does not let it lapse
+RENEW_FRACTION = 1 / 3
+
+# Seconds a worker waits for another worker's SQLite transaction
+SQLITE_TIMEOUT = 30
+
+
+def default_owner():
+    """Return a worker name that is unique across the machines sharing a round."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def default_round(schedule='all'):
+    """Return the round a run belongs to unless one is named: the UTC day, or the UTC hour for 'due' runs."""
+    return time.strftime('%Y-%m-%dT%H' if schedule == 'due' else '%Y-%m-%d', time.gmtime())
+
+
+class SqliteLeases:
+    """Leases in a SQLite file, for workers on one machine."""
+
+    def __init__(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(os.path.join(state_dir, 'leases.sqlite3'), timeout=SQLITE_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+        self._db.execute('''
+            create table if not exists leases (
+                round text not null,
+                shard text not null,
+                owner text not null,
+                expires_at real not null,
+                finished_at real,
+                primary key (round, shard)
+            )
+        ''')
+
+    def claim(self, lease_round, shards, owner, ttl=DEFAULT_LEASE_TTL, finished=False):
+        """Lease the first shard nobody holds or has finished this round, returning it or None.
+
+        With finished, shards already finished this round can be leased again too.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute('begin immediate')
+            try:
+                taken = {row[0] for row in self._db.execute(
+                    'select shard from leases where round = ? and ((finished_at is not null and not ?) '
+                    'or (finished_at is null and expires_at > ?))',
+                    (lease_round, finished, now),
+                )}
+                shard = next((shard for shard in shards if shard not in taken), None)
+                if shard is not None:
+                    self._db.execute(
+                        'insert or replace into leases (round, shard, owner, expires_at) values (?, ?, ?, ?)',
+                        (lease_round, shard, owner, now + ttl),
+                    )
+                self._db.execute('commit')
+            except Exception:
+                self._db.execute('rollback')
+                raise
+        return shard
+
+    def _update(self, sql, params):
+        with self._lock:
+            return self._db.execute(sql, params).rowcount == 1
+
+    def renew(self, lease_round, shard, owner, ttl=DEFAULT_LEASE_TTL):
+        """Extend owner's lease on shard; False means another worker has claimed it since."""
+        return self._update(
+            'update leases set expires_at = ? where round = ? and shard = ? and owner = ? and finished_at is null',
+            (time.time() + ttl, lease_round, shard, owner),
+        )
+
+    def finish(self, lease_round, shard, owner):
+        """Mark owner's shard done for the round, so no worker claims it again."""
+        return self._update(
+            'update leases set finished_at = ? where round = ? and shard = ? and owner = ? and finished_at is null',
+            (time.time(), lease_round, shard, owner),
+        )
+
+    def release(self, lease_round, shard, owner):
+        """Give up owner's unfinished lease on shard so another worker can claim it at once."""
+        return self._update(
+            'delete from leases where round = ? and shard = ? and owner = ? and finished_at is null',
+            (lease_round, shard, owner),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class SupabaseLeases:
+    """Leases in the Supabase scrape_leases table, claimed through the functions in
+    supabase/migrations/20261020000000_scrape_leases.sql."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _call(self, function, params):
+        response = self.client.rpc(function, params).execute()
+        if getattr(response, 'error', None):
+            raise RuntimeError(str(response.error))
+        return response.data
+
+    def claim(self, lease_round, shards, owner, ttl=DEFAULT_LEASE_TTL, finished=False):
+        """Lease the first shard nobody holds or has finished this round, returning it or None.
+
+        With finished, shards already finished this round can be leased again too.
+        """
+        return self._call('claim_scrape_lease', {
+            'lease_round': lease_round, 'shards': list(shards), 'lease_owner': owner, 'ttl_seconds': int(ttl),
+            'include_finished': finished,
+        }) or None
+
+    def renew(self, lease_round, shard, owner, ttl=DEFAULT_LEASE_TTL):
+        """Extend owner's lease on shard; False means another worker has claimed it since."""
+        return bool(self._call('renew_scrape_lease', {
+            'lease_round': lease_round, 'lease_shard': shard, 'lease_owner': owner, 'ttl_seconds': int(ttl),
+        }))
+
+    def finish(self, lease_round, shard, owner):
+        """Mark owner's shard done for the round, so no worker claims it again."""
+        return bool(self._call('finish_scrape_lease', {
+            'lease_round': lease_round, 'lease_shard': shard, 'lease_owner': owner,
+        }))
+
+    def release(self, lease_round, shard, owner):
+        """Give up owner's unfinished lease on shard so another worker can claim it at once."""
+        return bool(self._call('release_scrape_lease', {
+            'lease_round': lease_round, 'lease_shard': shard, 'lease_owner': owner,
+        }))
+
+    def close(self):
+        pass
+
+
+class LeaseKeeper:
+    """Renews a worker's leases on a background thread until the block exits.
+
+    Shards whose renewal finds the lease has passed to another worker are
+    added to ``lost``; the holder should stop starting work on them. Leaving
+    the block with an exception releases the leases still held.
+    """
+
+    def __init__(self, leases, lease_round, shards, owner, ttl=DEFAULT_LEASE_TTL):
+        self.leases = leases
+        self.lease_round = lease_round
+        self.shards = list(shards)
+        self.owner = owner
+        self.ttl = ttl
+        self.lost = set()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._renew, name='lease-keeper', daemon=True)
+
+    def _renew(self):
+        while not self._done.wait(self.ttl * RENEW_FRACTION):
+            for shard in self.shards:
+                if shard in self.lost:
+                    continue
+                try:
+                    if not self.leases.renew(self.lease_round, shard, self.owner, self.ttl):
+                        self.lost.add(shard)
+                except Exception:
+                    # A failed renewal is retried on the next tick; the lease outlives a few of them
+                    pass
+
+    def held(self):
+        """Return the shards whose leases this worker still holds."""
+        return [shard for shard in self.shards if shard not in self.lost]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._done.set()
+        self._thread.join()
+        if exc_type is not None:
+            for shard in self.held():
+                try:
+                    self.leases.release(self.lease_round, shard, self.owner)
+                except Exception:
+                    pass
+        return False
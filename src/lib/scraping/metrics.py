@@ -0,0 +1,140 @@
+# src/lib/scraping/metrics.py
+"""Per-stage, per-retailer timing histograms for scraper runs, with JSON and Prometheus output."""
+import os
+import threading
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Histogram name -> (buckets, help text). Names follow Prometheus unit suffixes.
+HISTOGRAMS = {
+    'connect_seconds': (SECONDS_BUCKETS, 'Time to open a new connection, including DNS and TLS'),
+    'ttfb_seconds': (SECONDS_BUCKETS, 'Time from sending a request to its response headers, including connect and retries'),
+    'download_seconds': (SECONDS_BUCKETS, 'Time to read a response body after its headers'),
+    'response_bytes': (BYTES_BUCKETS, 'Response body size as received on the wire'),
+    'parse_seconds': (SECONDS_BUCKETS, 'Time to parse a page and extract its price'),
+    'normalise_seconds': (SECONDS_BUCKETS, 'Time to normalise one batch of scraped prices'),
+    'write_seconds': (SECONDS_BUCKETS, 'Time for one bulk price write to Supabase'),
+}
+
+PROMETHEUS_PREFIX = 'price_scraper_'
+
+# Label used in the JSON output for observations not tied to one retailer
+ALL_RETAILERS = 'all'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum and max."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in, capped at the max."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max), 6)
+        return round(self.max, 6)
+
+    def to_json(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 6),
+        }
+
+
+class Metrics:
+    """Thread-safe collection of the HISTOGRAMS, labelled by retailer, plus extraction step counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._steps = {}
+
+    def observe(self, name, retailer, value):
+        """Record one observation; retailer may be None for run-wide stages such as writes."""
+        key = (name, retailer or ALL_RETAILERS)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(HISTOGRAMS[name][0])
+            histogram.observe(value)
+
+    def step(self, retailer, step):
+        """Count the extraction step that produced a price ('none' when every step failed)."""
+        key = (retailer or ALL_RETAILERS, step or 'none')
+        with self._lock:
+            self._steps[key] = self._steps.get(key, 0) + 1
+
+    def to_json(self):
+        """Return {'stages': {name: {retailer: stats}}, 'steps': {retailer: {step: count}}}."""
+        stages = {}
+        steps = {}
+        with self._lock:
+            for (name, retailer), histogram in sorted(self._histograms.items()):
+                stages.setdefault(name, {})[retailer] = histogram.to_json()
+            for (retailer, step), count in sorted(self._steps.items()):
+                steps.setdefault(retailer, {})[step] = count
+        return {'stages': stages, 'steps': steps}
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            step_counts = sorted(self._steps.items())
+        for name, (_, help_text) in HISTOGRAMS.items():
+            series = [(retailer, h) for (n, retailer), h in histograms if n == name]
+            if not series:
+                continue
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for retailer, histogram in series:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{retailer="{retailer}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{retailer="{retailer}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{retailer="{retailer}"}} {histogram.sum:.6f}')
+                lines.append(f'{metric}_count{{retailer="{retailer}"}} {histogram.count}')
+        if step_counts:
+            metric = PROMETHEUS_PREFIX + 'extraction_steps_total'
+            lines.append(f'# HELP {metric} Products priced by each extraction step')
+            lines.append(f'# TYPE {metric} counter')
+            for (retailer, step), count in step_counts:
+                lines.append(f'{metric}{{retailer="{retailer}",step="{step}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text file atomically, so a node exporter never reads half of it."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
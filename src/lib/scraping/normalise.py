@@ -0,0 +1,112 @@
+# src/lib/scraping/normalise.py
+"""Turns scraped prices into the pack price, price per kg and protein per dollar written for each product.
+
+Parsers report either a pack price or a price per kg (see
+RetailerParser.price_unit). Pack weights are parsed from the product row once
+and cached, and each write batch is normalised in one pass.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, unquote
+
+# Kilograms per unit of pack weight
+UNIT_KG = {
+    'kg': 1.0, 'kgs': 1.0, 'kilo': 1.0, 'kilos': 1.0, 'kilogram': 1.0, 'kilograms': 1.0,
+    'g': 0.001, 'gm': 0.001, 'gms': 0.001, 'gram': 0.001, 'grams': 0.001,
+    'lb': 0.45359237, 'lbs': 0.45359237, 'pound': 0.45359237, 'pounds': 0.45359237,
+    'oz': 0.028349523125,
+}
+
+# An optional "2 x" pack count, a number and a unit, e.g. "2.27kg", "5 lb" or "2 x 1kg"
+PACK_WEIGHT = re.compile(
+    r'(?<![\w.])(?:(\d+)\s*[x×]\s*)?(\d+(?:\.\d+)?)[\s-]*(' + '|'.join(sorted(UNIT_KG, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE,
+)
+# Product slugs write decimal points as hyphens: ".../whey-protein-2-27kg"
+SLUG_DECIMAL = re.compile(r'(?<=\d)-(?=\d+[\s-]*(?:kg|g|lb|oz))', re.IGNORECASE)
+
+# Pack weights outside these kilogram bounds are treated as misreads
+MIN_PACK_KG = 0.05
+MAX_PACK_KG = 25
+
+# Distinct products whose parsed pack weight is kept between batches
+WEIGHT_CACHE_SIZE = 100000
+
+# Product columns written from the values normalise returns, in order
+COLUMNS = ('price', 'price_per_kg', 'protein_per_dollar')
+
+# Decimal places kept in the written values
+PRICE_DIGITS = 2
+RATIO_DIGITS = 4
+
+
+def weight_in_text(text):
+    """Return the first plausible pack weight in text, in kg, or None."""
+    for match in PACK_WEIGHT.finditer(text or ''):
+        count = int(match.group(1) or 1)
+        kg = count * float(match.group(2)) * UNIT_KG[match.group(3).lower()]
+        if MIN_PACK_KG <= kg <= MAX_PACK_KG:
+            return kg
+    return None
+
+
+@lru_cache(maxsize=WEIGHT_CACHE_SIZE)
+def _pack_weight(weight, name, link):
+    try:
+        kg = float(weight) if weight is not None else None
+    except (TypeError, ValueError):
+        kg = None
+    if kg is not None and MIN_PACK_KG <= kg <= MAX_PACK_KG:
+        return kg
+    kg = weight_in_text(name)
+    if kg is None and link:
+        slug = unquote(urlsplit(link).path).replace('_', '-')
+        kg = weight_in_text(SLUG_DECIMAL.sub('.', slug))
+    return kg
+
+
+def pack_weight(product):
+    """Return the product's pack weight in kg: its weight column, else one named in its name or link."""
+    return _pack_weight(product.get('weight'), product.get('name'), product.get('link'))
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _rounded(value, digits):
+    return None if value is None or value != value else round(float(value), digits)
+
+
+def normalise(items):
+    """Normalise (product, price, unit) triples, returning a (price, price_per_kg, protein_per_dollar) tuple for each.
+
+    unit is 'pack' or 'kg'. A value that cannot be derived, such as the price
+    per kg of a product with no known weight, is None.
+    """
+    if not items:
+        return []
+    prices = [float(price) for _, price, _ in items]
+    per_kg = [unit == 'kg' for _, _, unit in items]
+    weights = [pack_weight(product) for product, _, _ in items]
+    protein = [_number(product.get('protein_per_100g')) for product, _, _ in items]
+    rows = _normalise_lists(prices, per_kg, weights, protein)
+    return [(_rounded(pack, PRICE_DIGITS), _rounded(kg, RATIO_DIGITS), _rounded(ratio, RATIO_DIGITS))
+            for pack, kg, ratio in rows]
+
+
+def _normalise_lists(prices, per_kg, weights, protein):
+    rows = []
+    for price, is_per_kg, weight, grams in zip(prices, per_kg, weights, protein):
+        if is_per_kg:
+            pack, price_per_kg = (price * weight if weight else None), price
+        else:
+            pack, price_per_kg = price, (price / weight if weight else None)
+        # Grams of protein per kg of powder over dollars per kg
+        protein_per_dollar = grams * 10 / price_per_kg if grams and price_per_kg else None
+        rows.append((pack, price_per_kg, protein_per_dollar))
+    return rows
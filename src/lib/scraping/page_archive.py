@@ -0,0 +1,213 @@
+# src/lib/scraping/page_archive.py
+"""Append-only archive of fetched product pages, and offline replay of the extractors over it.
+
+Each record is one gzip member holding a JSON object with the page's URL,
+status, headers, fetch time, body and the price and step extracted from it.
+Members are appended to pages.arc, so the file is also a valid gzip stream
+(``zcat pages.arc`` prints one JSON record per line). index.sqlite3 holds each
+record's offset and length, so any page can be read back without scanning.
+Writers in several processes take SQLite's write lock around each append.
+"""
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from retailers import module_for
+from parse_pool import extract_in_worker, DEFAULT_PARSE_WORKERS
+
+ARCHIVE_FILE = 'pages.arc'
+INDEX_FILE = 'index.sqlite3'
+
+# gzip level for new records; 6 keeps capture cheap on the fetch threads
+COMPRESS_LEVEL = 6
+
+# Records each replay task reads and extracts, so one task opens the archive once per batch
+REPLAY_CHUNK = 25
+
+# Seconds a writer waits for another process's append
+SQLITE_TIMEOUT = 30
+
+
+class PageArchive:
+    """Writes fetched pages to an archive directory and reads them back by index."""
+
+    def __init__(self, archive_dir):
+        os.makedirs(archive_dir, exist_ok=True)
+        self.path = os.path.join(archive_dir, ARCHIVE_FILE)
+        self._lock = threading.Lock()
+        # Autocommit, so each append can hold the write lock from BEGIN IMMEDIATE to its index row
+        self._db = sqlite3.connect(os.path.join(archive_dir, INDEX_FILE), timeout=SQLITE_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+        self._db.executescript('''
+            create table if not exists records (
+                id integer primary key,
+                url text not null,
+                retailer text,
+                fetched_at real not null,
+                status integer,
+                price real,
+                step text,
+                truncated integer not null default 0,
+                offset integer not null,
+                length integer not null
+            );
+            create index if not exists records_url_idx on records (url, id);
+        ''')
+        self._file = open(self.path, 'ab')
+
+    def add(self, url, status, headers, body, price, step, truncated=False):
+        """Append one fetched page with the price and step extracted from it."""
+        fetched_at = time.time()
+        record = {
+            'url': url,
+            'status': status,
+            'headers': dict(headers or {}),
+            'fetched_at': fetched_at,
+            'price': price,
+            'step': step,
+            'truncated': truncated,
+            'body': body,
+        }
+        data = gzip.compress(json.dumps(record).encode('utf-8') + b'\n', COMPRESS_LEVEL, mtime=0)
+        with self._lock:
+            self._db.execute('begin immediate')
+            try:
+                offset = os.fstat(self._file.fileno()).st_size
+                self._file.write(data)
+                self._file.flush()
+                self._db.execute(
+                    'insert into records (url, retailer, fetched_at, status, price, step, truncated, offset, length) '
+                    'values (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url, module_for(url), fetched_at, status, price, step, int(truncated), offset, len(data)),
+                )
+                self._db.execute('commit')
+            except Exception:
+                self._db.execute('rollback')
+                raise
+
+    def entries(self, retailer=None, latest=True):
+        """Return index rows as dicts, oldest first; latest keeps only the newest record per URL."""
+        sql = 'select id, url, retailer, fetched_at, price, step, truncated, offset, length from records'
+        where, params = [], []
+        if latest:
+            where.append('id in (select max(id) from records group by url)')
+        if retailer is not None:
+            where.append('retailer = ?')
+            params.append(retailer)
+        if where:
+            sql += ' where ' + ' and '.join(where)
+        with self._lock:
+            rows = self._db.execute(sql + ' order by id', params).fetchall()
+        names = ('id', 'url', 'retailer', 'fetched_at', 'price', 'step', 'truncated', 'offset', 'length')
+        return [dict(zip(names, row)) for row in rows]
+
+    def get(self, url):
+        """Return the newest archived record for url as a dict, or None."""
+        with self._lock:
+            row = self._db.execute(
+                'select offset, length from records where url = ? order by id desc limit 1', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(row[0])
+            return json.loads(gzip.decompress(f.read(row[1])))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._db.close()
+
+
+def _replay_chunk(path, entries):
+    # Runs in a replay worker: read each page from the archive and extract it again
+    results = []
+    with open(path, 'rb') as f:
+        for entry in entries:
+            f.seek(entry['offset'])
+            record = json.loads(gzip.decompress(f.read(entry['length'])))
+            price, step, seconds = extract_in_worker(record['url'], record['body'])
+            results.append((entry, price, step, seconds, len(record['body'])))
+    return results
+
+
+def _changed(old_price, new_price):
+    if old_price is None or new_price is None:
+        return old_price != new_price
+    return abs(old_price - new_price) >= 0.005
+
+
+def replay(archive_dir, workers=DEFAULT_PARSE_WORKERS, retailer=None):
+    """Re-run the current extractors over the newest archived copy of each page, without any network access.
+
+    Returns a report with throughput, per-retailer counts and every page whose
+    price would now differ from the one extracted when it was captured:
+    'fixed' pages now have a price where none was found, 'broken' ones lost it.
+    """
+    if not os.path.exists(os.path.join(archive_dir, INDEX_FILE)):
+        raise ValueError(f'No page archive in {archive_dir}')
+    archive = PageArchive(archive_dir)
+    try:
+        entries = archive.entries(retailer)
+    finally:
+        archive.close()
+    chunks = [entries[start:start + REPLAY_CHUNK] for start in range(0, len(entries), REPLAY_CHUNK)]
+    path = os.path.join(archive_dir, ARCHIVE_FILE)
+
+    start = time.perf_counter()
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(_replay_chunk, [path] * len(chunks), chunks))
+    else:
+        batches = [_replay_chunk(path, chunk) for chunk in chunks]
+    seconds = time.perf_counter() - start
+
+    retailers = {}
+    changes = []
+    parse_seconds = 0.0
+    size = 0
+    for batch in batches:
+        for entry, price, step, parse_time, body_length in batch:
+            parse_seconds += parse_time
+            size += body_length
+            counts = retailers.setdefault(entry['retailer'] or 'unsupported', {
+                'pages': 0, 'priced': 0, 'changed': 0, 'fixed': 0, 'broken': 0
+            })
+            counts['pages'] += 1
+            if price is not None:
+                counts['priced'] += 1
+            if not _changed(entry['price'], price):
+                continue
+            counts['changed'] += 1
+            if entry['price'] is None:
+                counts['fixed'] += 1
+            elif price is None:
+                counts['broken'] += 1
+            changes.append({
+                'url': entry['url'],
+                'retailer': entry['retailer'],
+                'fetched_at': entry['fetched_at'],
+                'archived_price': entry['price'],
+                'archived_step': entry['step'],
+                'price': price,
+                'step': step,
+                'truncated': bool(entry['truncated']),
+            })
+
+    return {
+        'success': True,
+        'replay': {
+            'pages': len(entries),
+            'seconds': round(seconds, 3),
+            'pages_per_second': round(len(entries) / seconds, 1) if seconds else None,
+            'parse_seconds': round(parse_seconds, 3),
+            'body_bytes': size,
+            'workers': workers if workers > 1 and len(chunks) > 1 else 1,
+        },
+        'retailers': retailers,
+        'changes': changes,
+    }
@@ -0,0 +1,56 @@
+# src/lib/scraping/parse_pool.py
+"""Process pool that runs retailer extraction off the fetch threads.
+
+Fetching is I/O-bound and runs on threads; parsing a page and scanning it for a
+price is CPU-bound and would otherwise contend for the GIL with every fetch.
+Pages are handed to worker processes through a bounded queue: when it is full,
+fetch threads block before submitting, so they stop downloading until the
+parsers catch up.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from retailers import get_parser
+
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1
+
+
+def extract_in_worker(url, html):
+    """Run the retailer parser for url over html and return (price, step name, seconds)."""
+    parser = get_parser(url)
+    if parser is None:
+        return None, None, 0.0
+    start = time.perf_counter()
+    price, step = parser.extract_html(html)
+    return price, step, time.perf_counter() - start
+
+
+def _start_method():
+    # Fetch threads are already running when the first worker starts, so avoid plain fork
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class ParsePool:
+    """Runs extract_in_worker in worker processes, with at most max_pending pages queued or parsing."""
+
+    def __init__(self, workers=DEFAULT_PARSE_WORKERS, max_pending=None):
+        self.workers = max(1, int(workers))
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 2)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(_start_method()),
+        )
+
+    def extract(self, url, html):
+        """Parse html in a worker process and return (price, step name, seconds).
+
+        Blocks while the queue is full, which holds back the calling fetch thread.
+        """
+        with self._slots:
+            return self._executor.submit(extract_in_worker, url, html).result()
+
+    def close(self):
+        self._executor.shutdown()
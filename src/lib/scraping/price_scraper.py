@@ -1,563 +1,958 @@
 # src/lib/scraping/price_scraper.py
-import requests
-from bs4 import BeautifulSoup, SoupStrainer
+#
+# Heavy dependencies (requests, supabase, BeautifulSoup) are imported where they
+# are first used, so importing this module for parser work or a single price
+# check does not need Supabase credentials or pay for clients it never uses.
 import json
 import os
-from supabase import create_client, Client
 import sys
+import threading
 import traceback
-import re
-from dotenv import load_dotenv
+import argparse
+import time
+from retailers import get_parser, module_for
+from retailers.structured import SOURCES as STRUCTURED_SOURCES
+from retailers.platforms import EndpointUnavailable, platform_prices, STEPS as PLATFORM_STEPS
+from http_cache import HttpCache, DEFAULT_CACHE_DIR, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from fingerprints import PriceFingerprints
+from page_archive import PageArchive, replay as replay_archive
+from scrape_state import ScrapeState, select_due, select_unswept
+from http_client import HttpClient, pop_connect_seconds, read_until, DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_BACKOFF
+from metrics import Metrics
+from canonical import group_pages, page_url
+from catalogue import iter_catalogue, catalogue_hosts, DEFAULT_PAGE_SIZE
+from leases import LeaseKeeper, SqliteLeases, SupabaseLeases, default_owner, default_round, DEFAULT_LEASE_TTL
+from normalise import normalise, COLUMNS as NORMALISED_COLUMNS
+from host_health import HostHealth, HostUnavailable, DEFAULT_FAILURE_THRESHOLD, DEFAULT_COOLDOWN
+from parse_pool import ParsePool, extract_in_worker, DEFAULT_PARSE_WORKERS
+from worker import serve, DEFAULT_HOST as DEFAULT_WORKER_HOST, DEFAULT_PORT as DEFAULT_WORKER_PORT
+from fetch_pool import (
+    HostLimiter,
+    host_key,
+    run_concurrently,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PER_HOST,
+    DEFAULT_HOST_DELAY,
+)
 
-# Load environment variables from .env.local file
-load_dotenv('.env.local')
+_supabase = None
+_supabase_lock = threading.Lock()
 
-# Initialize Supabase client with secure environment variable handling
-url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+def get_supabase():
+    """Return the shared Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                from dotenv import load_dotenv
+                from supabase import create_client
+                
+                # Load environment variables from .env.local file
+                load_dotenv('.env.local')
+                
+                # Initialize Supabase client with secure environment variable handling
+                url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+                key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+                
+                if not url or not key:
+                    raise ValueError("Missing required environment variables: NEXT_PUBLIC_SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+                
+                _supabase = create_client(url, key)
+    return _supabase
 
-if not url or not key:
-    raise ValueError("Missing required environment variables: NEXT_PUBLIC_SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+# Pooled per-host sessions shared by every fetch; replaced from the command line options
+http_client = HttpClient()
 
-supabase: Client = create_client(url, key)
+# Circuit breaker and adaptive timeouts per retailer host; replaced from the command line options
+host_health = HostHealth()
 
-def scrape_price(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+# Optional conditional-GET page cache, set up by the command line entry point
+http_cache = None
+
+# Optional price-region fingerprints that let unchanged pages skip extraction,
+# set up by the command line entry point
+price_fingerprints = None
+
+# Optional capture archive every downloaded product page is appended to,
+# set up by the command line entry point
+page_archive = None
+
+# Optional process pool for extraction, set up by the command line entry point;
+# without it pages are parsed on the fetch threads
+parse_pool = None
+
+# Seconds allowed for a single product page request
+REQUEST_TIMEOUT = 30
+
+def request(url, headers=None, timeout=REQUEST_TIMEOUT, **kwargs):
+    """GET through the shared client with the host's adaptive timeout, recording the outcome."""
+    from requests import RequestException
     
+    host = host_key(url)
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=host_health.timeout(host, timeout), **kwargs)
+    except RequestException:
+        host_health.failure(host)
+        raise
+    # 429/5xx are only returned once retries are exhausted
+    if response.status_code == 429 or response.status_code >= 500:
+        host_health.failure(host)
+    else:
+        host_health.success(host, response.elapsed.total_seconds())
+    return response
+
+def fetch(url, timeout=REQUEST_TIMEOUT, headers=None, metrics=None, full=False):
+    """GET a page and return (response, html, truncated).
+    
+    Unless full is set, a successful body is only read as far as the retailer
+    parser's max_bytes or stop_marker. Connect, first-byte and download timings
+    are recorded when metrics is given.
+    """
+    parser = get_parser(url)
+    limited = not full and parser is not None and (parser.max_bytes or parser.stop_marker)
+    if metrics is None and not limited:
+        response = request(url, headers, timeout)
+        return response, response.text, False
+    
+    pop_connect_seconds()
+    start = time.perf_counter()
+    # Stream so the body can be cut short and the headers and body timed separately
+    response = request(url, headers, timeout, stream=True)
+    first_byte = time.perf_counter()
+    if limited and response.status_code == 200:
+        body, truncated = read_until(response, parser.max_bytes, parser.stop_marker)
+        if not truncated:
+            # The stream is used up; keep the whole body on the response so .text and .content still work
+            response._content = body
+    else:
+        body, truncated = response.content, False
+    done = time.perf_counter()
+    
+    if metrics is not None:
+        retailer = module_for(url)
+        connect_seconds = pop_connect_seconds()
+        if connect_seconds:
+            # Only new connections are timed; reused keep-alive connections cost nothing here
+            metrics.observe('connect_seconds', retailer, connect_seconds)
+        metrics.observe('ttfb_seconds', retailer, first_byte - start)
+        metrics.observe('download_seconds', retailer, done - first_byte)
+        metrics.observe('response_bytes', retailer, response.raw.tell() or len(body))
+    
+    if not truncated:
+        return response, response.text, False
+    # A multi-byte character may have been cut at the end of the partial body
+    return response, body.decode(response.encoding or 'utf-8', errors='replace'), True
+
+def extract_page(url, html, metrics=None):
+    """Run the registered retailer parser for url over a downloaded page and return (price, step)."""
+    retailer = module_for(url)
+    if retailer is None:
+        return None, None
+    if parse_pool is not None:
+        price, step, seconds = parse_pool.extract(url, html)
+    else:
+        price, step, seconds = extract_in_worker(url, html)
+    if metrics is not None:
+        metrics.observe('parse_seconds', retailer, seconds)
+        metrics.step(retailer, step)
+    return price, step
+
+def extract_price(url, html, metrics=None):
+    """Run the registered retailer parser for url over a downloaded page."""
+    return extract_page(url, html, metrics)[0]
+
+# Seconds a store whose JSON product endpoint answered 401/403/404 goes straight to HTML: the rest of
+# a one-off run, while a resident worker tries a temporarily blocked endpoint again later
+API_UNAVAILABLE_SECONDS = 3600
+
+# When each store's JSON product endpoint last answered 401/403/404
+api_unavailable_hosts = {}
+
+def api_prices(urls, parser, timeout=REQUEST_TIMEOUT, metrics=None):
+    """Price links to variants of one product through the store's Shopify/WooCommerce JSON endpoint.
+    
+    Returns {url: (price, step)} from a single lookup; links it could not
+    price map to (None, None).
+    """
+    host = host_key(urls[0])
+    none = {url: (None, None) for url in urls}
+    refused = api_unavailable_hosts.get(host)
+    if refused is not None and time.monotonic() - refused < API_UNAVAILABLE_SECONDS:
+        return none
+    
+    def get_json(api_url):
+        response, text, _ = fetch(api_url, timeout, {'Accept': 'application/json'}, metrics, full=True)
+        if response.status_code in (401, 403, 404):
+            raise EndpointUnavailable(api_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
+        return json.loads(text)
+    
+    try:
+        prices = platform_prices(parser.platform, urls, get_json, parser.in_range)
+    except EndpointUnavailable:
+        api_unavailable_hosts[host] = time.monotonic()
+        return none
+    except Exception as e:
+        # Anything unexpected in the JSON falls back to the product page
+        print(f"Product API error for {urls[0]}: {str(e)}", file=sys.stderr)
+        return none
+    if metrics is not None:
+        for price, step in prices.values():
+            if price is not None:
+                metrics.step(parser.name, step)
+    return prices
+
+def api_price(url, parser, timeout=REQUEST_TIMEOUT, metrics=None):
+    """Look a price up through the store's Shopify/WooCommerce JSON endpoint, returning (price, step)."""
+    return api_prices([url], parser, timeout, metrics)[url]
+
+def unchanged_price(url, parser, html, metrics=None):
+    """Return (price, 'fingerprint') when the markup url's last price came from is unchanged, else (None, None)."""
+    known = price_fingerprints.get(url) if price_fingerprints is not None else None
+    if known is None or parser.fingerprint(html, known.step) != known.digest:
+        return None, None
+    if metrics is not None:
+        metrics.step(parser.name, 'fingerprint')
+    return known.price, 'fingerprint'
+
+def remember_price(url, parser, html, price, step):
+    """Store the fingerprint of the markup a freshly extracted price came from, if it has one."""
+    if price_fingerprints is None or price is None:
+        return
+    digest = parser.fingerprint(html, step)
+    if digest is not None:
+        price_fingerprints.put(url, digest, price, step)
+
+def archive_page(url, response, html, price, step, truncated=False):
+    """Append a downloaded page and the price extracted from it to the capture archive, if one is open."""
+    if page_archive is None:
+        return
+    try:
+        page_archive.add(url, response.status_code, response.headers, html, price, step, truncated)
+    except Exception as e:
+        # Capture is best effort; the scrape itself has already succeeded
+        print(f"Archive error for {url}: {str(e)}", file=sys.stderr)
+
+def price_source(step):
+    """Describe which path produced a price: a store API, structured data, an HTML step, the page cache or a fingerprint."""
+    if step is None:
+        return {}
+    if step in ('cache', 'fingerprint'):
+        return {'source': step}
+    if step in PLATFORM_STEPS:
+        return {'source': 'api', 'step': step}
+    return {'source': 'structured' if step in STRUCTURED_SOURCES else 'html', 'step': step}
+
+def scrape_price(url, timeout=REQUEST_TIMEOUT, metrics=None):
+    return scrape_page(url, timeout, metrics)[0]
+
+def scrape_page(url, timeout=REQUEST_TIMEOUT, metrics=None, use_api=True, checked=False):
+    """Fetch and extract a product page, returning (price, step).
+    
+    step names the parser step that found the price (see price_source), or is
+    'cache' when a 304 let the cached price stand. Raises HostUnavailable while
+    the retailer's circuit breaker is open. use_api=False skips the store's JSON
+    endpoint, for callers that already tried it. checked=True skips the circuit
+    check, for callers whose own check may have taken the single probe a
+    recovering host admits.
+    """
+    from requests import RequestException
+    
+    # Unsupported retailers are skipped without downloading the page
+    parser = get_parser(url)
+    if parser is None:
+        return None, None
+    
+    # A retailer that keeps failing is skipped until its cooldown passes
+    if not checked and not host_health.allow(host_key(url)):
+        raise HostUnavailable(host_key(url))
+    
+    try:
+        # Shopify and WooCommerce stores answer from a few KB of JSON; the page is the fallback
+        if parser.platform is not None and use_api:
+            price, step = api_price(url, parser, timeout, metrics)
+            if price is not None:
+                return price, step
         
-        if 'myprotein.com' in url:
-            try:
-                # First, try to find the main product price using the specific class structure
-                # Look for span with text-2xl font-semibold class (main price display)
-                price_elements = soup.find_all('span', class_='text-2xl font-semibold')
-                
-                for element in price_elements:
-                    text = element.get_text(strip=True)
-                    # Look for A$ price patterns
-                    if 'A$' in text:
-                        price_match = re.search(r'A\$(\d+\.\d+)', text)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1))
-                                # Validate it's a reasonable total product price
-                                if 20 <= price <= 500:
-                                    return price
-                            except ValueError:
-                                continue
-                
-                # Fallback: try to find any price with A$ pattern in any element
-                for element in soup.find_all(['span', 'div', 'p']):
-                    text = element.get_text(strip=True)
-                    if 'A$' in text and '/kg' not in text and 'out of 5' not in text:
-                        price_match = re.search(r'A\$(\d+\.\d+)', text)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1))
-                                if 20 <= price <= 500:
-                                    return price
-                            except ValueError:
-                                continue
-                
-                # Additional fallback: look for any price without /kg
-                for element in soup.find_all(['span', 'div', 'p']):
-                    text = element.get_text(strip=True)
-                    if '$' in text and '/kg' not in text and 'out of 5' not in text:
-                        price_match = re.search(r'\$(\d+\.\d+)', text)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1))
-                                if 20 <= price <= 500:
-                                    return price
-                            except ValueError:
-                                continue
-            except Exception:
-                # If MyProtein scraping fails, return None
-                pass
-                
-        elif 'chemistwarehouse.com.au' in url:
-            try:
-                # Try the specific price span first
-                price_element = soup.find('span', {'class': 'product__price'})
-                if not price_element:
-                    # Fallback to ID if class doesn't work
-                    price_element = soup.find('span', id=lambda x: x and 'lblActualPrice' in x)
-                if not price_element:
-                    # Fallback to h2 with the correct class
-                    price_element = soup.find('h2', {'class': 'display-l text-colour-title-light'})
-                if price_element:
-                    try:
-                        price_text = price_element.get_text(strip=True)
-                        price = float(price_text.replace('$', '').strip())
-                        # Convert to price per kg using the weight from the product title
-                        weight_element = soup.find('h1', {'class': 'product__title'})
-                        if weight_element:
-                            weight_text = weight_element.get_text(strip=True)
-                            weight_match = re.search(r'(\d+(?:\.\d+)?)\s*kg', weight_text, re.IGNORECASE)
-                            if weight_match:
-                                weight_kg = float(weight_match.group(1))
-                                price_per_kg = price / weight_kg
-                                if 20 <= price_per_kg <= 200:  # Sanity check
-                                    return price_per_kg
-                        # If no weight found in title, return price if it's within range
-                        if 20 <= price <= 200:
-                            return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If Chemist Warehouse scraping fails, return None
-                pass
-                    
-        elif 'costpricesupplements.com.au' in url:
-            try:
-                # Look for the variations form that contains the price data
-                variations_form = soup.find('form', {'class': 'variations_form'})
-                if variations_form:
-                    # Get the data-product_variations attribute
-                    variations_data = variations_form.get('data-product_variations')
-                    if variations_data:
-                        try:
-                            # Parse the JSON data (handle HTML entities)
-                            variations_data = variations_data.replace('&quot;', '"')
-                            variations = json.loads(variations_data)
-                            
-                            # Get the first available variation's price
-                            for variation in variations:
-                                if variation.get('is_in_stock', False):
-                                    display_price = variation.get('display_price')
-                                    if display_price:
-                                        price = float(display_price)
-                                        if 20 <= price <= 200:  # Sanity check
-                                            return price
-                                    break
-                        except (json.JSONDecodeError, ValueError, AttributeError, TypeError):
-                            # If JSON parsing fails, continue to fallback method
-                            pass
-                
-                # Fallback: try to find price in hidden input fields
-                price_input = soup.find('input', {'name': 'gtm4wp_price'})
-                if price_input:
-                    try:
-                        price = float(price_input.get('value', 0))
-                        if 20 <= price <= 200:
-                            return price
-                    except (ValueError, AttributeError):
-                        pass
-            except Exception:
-                # If any error occurs in Cost Price Supplements section, just return None
-                pass
-                    
-        elif 'bulknutrients.com.au' in url:
-            try:
-                price_element = soup.select_one('.product-price')
-                if price_element:
-                    try:
-                        price_text = price_element.get_text(strip=True)
-                        price = float(price_text.replace('$', '').strip())
-                        if 20 <= price <= 200:  # Sanity check
-                            return price
-                    except (AttributeError, ValueError):
-                        return None
-            except Exception:
-                # If Bulk Nutrients scraping fails, return None
-                pass
-                
-        elif 'blackbeltprotein.com.au' in url:
-            try:
-                # Look for the price in span with class "right" containing "per kilo"
-                price_elements = soup.find_all('span', class_='right')
-                
-                for element in price_elements:
-                    text = element.get_text(strip=True)
-                    # Look for price patterns like "$30.60 per kilo"
-                    if 'per kilo' in text.lower():
-                        price_match = re.search(r'\$(\d+\.\d+)', text)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1))
-                                if 20 <= price <= 200:  # Sanity check for price per kg
-                                    return price
-                            except ValueError:
-                                continue
-                
-                # Fallback: look for any price with $ pattern in the page
-                for element in soup.find_all(['span', 'div', 'p']):
-                    text = element.get_text(strip=True)
-                    if '$' in text and 'per kilo' in text.lower():
-                        price_match = re.search(r'\$(\d+\.\d+)', text)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1))
-                                if 20 <= price <= 200:
-                                    return price
-                            except ValueError:
-                                continue
-            except Exception:
-                # If BlackBelt Protein scraping fails, return None
-                pass
-                
-        elif 'coles.com.au' in url:
-            try:
-                # Look for the price in span with class "price__value" and data-testid "pricing"
-                # The price is in: <span class="price__value" data-testid="pricing" aria-label="Price $26.60">$26.60</span>
-                
-                # Try using CSS selector for more reliable matching
-                price_element = soup.select_one('span.price__value[data-testid="pricing"]')
-                
-                # Fallback: try finding by data-testid only
-                if not price_element:
-                    price_element = soup.find('span', {'data-testid': 'pricing'})
-                
-                # Another fallback: try CSS selector with just class
-                if not price_element:
-                    price_element = soup.select_one('span.price__value')
-                
-                # Another fallback: try regular find with class_
-                if not price_element:
-                    price_element = soup.find('span', class_='price__value')
-                
-                if price_element:
-                    try:
-                        # First try to get price from text content (e.g., "$26.60")
-                        price_text = price_element.get_text(strip=True)
-                        # Improved regex to handle decimal prices: matches $26.60, $26.6, $26, etc.
-                        price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                        
-                        # If not found in text, try aria-label attribute (e.g., "Price $26.60")
-                        if not price_match:
-                            aria_label = price_element.get('aria-label', '')
-                            if aria_label:
-                                price_match = re.search(r'\$(\d+\.?\d{0,2})', aria_label)
-                        
-                        if price_match:
-                            price = float(price_match.group(1))
-                            # Sanity check for product price (Coles products typically range from $5 to $200)
-                            if 5 <= price <= 200:
-                                return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If Coles scraping fails, return None
-                pass
-                
-        elif 'musclenation.org' in url:
-            try:
-                # Look for the price in span with class "money" and data-default-currency attribute
-                price_element = soup.find('span', {'class': 'money', 'data-currency': 'AUD'})
-                
-                # Fallback: try just class if data-currency doesn't work
-                if not price_element:
-                    price_element = soup.find('span', {'class': 'money'})
-                
-                if price_element:
-                    try:
-                        # Try to get price from data-default-currency attribute first
-                        price_text = price_element.get('data-default-currency')
-                        
-                        # If not found in attribute, get from element text
-                        if not price_text:
-                            price_text = price_element.get_text(strip=True)
-                        
-                        # Remove A$ or $ sign and parse the price
-                        price_match = re.search(r'A?\$(\d+\.?\d*)', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            # Sanity check for product price (Muscle Nation products typically range from $10 to $300)
-                            if 10 <= price <= 300:
-                                return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If Muscle Nation scraping fails, return None
-                pass
-                
-        elif 'amazon.com' in url:
-            try:
-                # Look for the price in span with class "a-offscreen"
-                # Amazon uses this class to hide the price for screen readers but it contains clean price text
-                price_elements = soup.find_all('span', {'class': 'a-offscreen'})
-                
-                for price_element in price_elements:
-                    try:
-                        price_text = price_element.get_text(strip=True)
-                        # Look for price patterns with $ sign
-                        price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            # Sanity check for product price (Amazon products typically range from $10 to $500)
-                            # Skip very small prices that might be shipping costs or other fees
-                            if 10 <= price <= 500:
-                                return price
-                    except (AttributeError, ValueError):
-                        continue
-                
-                # Fallback: look for price in other common Amazon price elements
-                price_selectors = [
-                    {'class': 'a-price-whole'},
-                    {'class': 'a-color-price'},
-                    {'id': 'priceblock_ourprice'},
-                    {'id': 'priceblock_dealprice'}
-                ]
-                
-                for selector in price_selectors:
-                    price_element = soup.find('span', selector)
-                    if price_element:
-                        try:
-                            price_text = price_element.get_text(strip=True)
-                            price_match = re.search(r'\$?(\d+\.?\d*)', price_text)
-                            if price_match:
-                                price = float(price_match.group(1))
-                                if 10 <= price <= 500:
-                                    return price
-                        except (AttributeError, ValueError):
-                            continue
-            except Exception:
-                # If Amazon scraping fails, return None
-                pass
-                
-        elif 'ppprotein.com.au' in url:
-            try:
-                # Look for the price in span with class "price-item price-item--sale price-item--last"
-                # This is the sale price element on ppprotein.com.au product pages
-                price_element = soup.find('span', class_='price-item price-item--sale price-item--last')
-                
-                # Fallback: try finding any element with these classes (in case order differs)
-                if not price_element:
-                    price_element = soup.find('span', class_=lambda x: x and 'price-item' in x and 'price-item--sale' in x)
-                
-                # Another fallback: try finding any element with price-item--sale class
-                if not price_element:
-                    price_element = soup.find('span', class_='price-item--sale')
-                
-                if price_element:
-                    try:
-                        price_text = price_element.get_text(strip=True)
-                        # Remove dollar sign and parse the price (format: "$47.00" or "$47")
-                        price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            # Sanity check for product price (ppprotein products typically range from $20 to $200)
-                            if 20 <= price <= 200:
-                                return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If ppprotein.com.au scraping fails, return None
-                pass
-                
-        elif 'topathlete.com.au' in url:
-            try:
-                # Look for the price in meta tag with property "og:price:amount"
-                # The price is stored in the content attribute (e.g., content="55.00" for $55)
-                price_meta = soup.find('meta', {'property': 'og:price:amount'})
-                
-                if price_meta:
-                    try:
-                        price_content = price_meta.get('content', '').strip()
-                        if price_content:
-                            price = float(price_content)
-                            # Sanity check for product price (topathlete products typically range from $20 to $200)
-                            if 20 <= price <= 200:
-                                return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If topathlete.com.au scraping fails, return None
-                pass
-                
-        elif 'vpa.com.au' in url:
-            try:
-                # Look for the price in div with class "cost"
-                # The price is in: <div class="cost">$75.00 </div>
-                price_element = soup.find('div', class_='cost')
-                
-                # Fallback: try CSS selector
-                if not price_element:
-                    price_element = soup.select_one('div.cost')
-                
-                if price_element:
-                    try:
-                        price_text = price_element.get_text(strip=True)
-                        # Remove dollar sign and parse the price (format: "$75.00" or "$75")
-                        price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            # Sanity check for product price (VPA products should be less than $100)
-                            if 20 <= price < 100:
-                                return price
-                    except (AttributeError, ValueError):
-                        pass
-            except Exception:
-                # If vpa.com.au scraping fails, return None
-                pass
-                
-        elif 'pure-product.com' in url:
-            try:
-                # Look for the price in bdi element containing price__prefix and price__suffix
-                # The price structure: div.price__regular > dd > span > price-money > bdi > span.price__prefix
-                # The price is in: <bdi><span class="price__prefix">$</span>48<sup class="price__suffix">.00</sup> AUD</bdi>
-                
-                # Method 1: Use CSS selector to find bdi inside price__regular
-                try:
-                    price_bdi = soup.select_one('div.price__regular price-money bdi')
-                    if price_bdi:
-                        price_text = price_bdi.get_text(strip=True)
-                        price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            if 20 <= price <= 200:
-                                return price
-                except:
-                    pass
-                
-                # Method 2: Find price-money element (custom element) and then find bdi inside it
-                price_money = soup.find('price-money')
-                if price_money:
-                    price_bdi = price_money.find('bdi')
-                    if price_bdi:
-                        price_text = price_bdi.get_text(strip=True)
-                        price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            if 20 <= price <= 200:
-                                return price
-                
-                # Method 3: Find div.price__regular and navigate to bdi
-                price_regular = soup.find('div', class_='price__regular')
-                if price_regular:
-                    # Find price-money inside price__regular
-                    price_money = price_regular.find('price-money')
-                    if price_money:
-                        price_bdi = price_money.find('bdi')
-                        if price_bdi:
-                            price_text = price_bdi.get_text(strip=True)
-                            price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                            if price_match:
-                                price = float(price_match.group(1))
-                                if 20 <= price <= 200:
-                                    return price
-                
-                # Method 4: Find span with price__prefix and navigate up to bdi
-                prefix_span = soup.find('span', class_='price__prefix')
-                if prefix_span:
-                    price_bdi = prefix_span.find_parent('bdi')
-                    if price_bdi:
-                        price_text = price_bdi.get_text(strip=True)
-                        price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            if 20 <= price <= 200:
-                                return price
-                
-                # Method 5: Search all bdi elements for one containing price structure
-                all_bdi = soup.find_all('bdi')
-                for bdi in all_bdi:
-                    prefix = bdi.find('span', class_='price__prefix')
-                    suffix = bdi.find('sup', class_='price__suffix')
-                    if prefix or suffix:
-                        price_text = bdi.get_text(strip=True)
-                        price_match = re.search(r'\$(\d+\.?\d{0,2})', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                            if 20 <= price <= 200:
-                                return price
-            except Exception:
-                # If pure-product.com scraping fails, return None
-                pass
-                
-        return None
+        # Revalidate any cached copy; a 304 means the last extracted price still holds
+        entry = http_cache.get(url) if http_cache is not None else None
+        headers = HttpCache.validators(entry) if entry else None
+        response, html, truncated = fetch(url, timeout, headers, metrics)
+        if entry is not None and response.status_code == 304:
+            price, step = entry.price, 'cache'
+            if price is None:
+                price, step = extract_page(url, entry.body, metrics)
+            http_cache.revalidated(url, price)
+            return price, step
+        
+        response.raise_for_status()
+        price, step = unchanged_price(url, parser, html, metrics)
+        if price is None:
+            price, step = extract_page(url, html, metrics)
+            if price is None and truncated:
+                # The price was not in the part of the page read; try the whole page
+                response, html, truncated = fetch(url, timeout, metrics=metrics, full=True)
+                response.raise_for_status()
+                price, step = extract_page(url, html, metrics)
+            remember_price(url, parser, html, price, step)
+        archive_page(url, response, html, price, step, truncated)
+        # A page read only up to its stop marker or byte cap is not cached, so a 304 never replays part of a page
+        if http_cache is not None and not truncated:
+            http_cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), html, price)
+        return price, step
         
-    except requests.RequestException as e:
+    except RequestException as e:
         # Log request errors but don't expose sensitive information
-        print(f"Request error for {url}: {str(e)}")
-        return None
+        print(f"Request error for {url}: {str(e)}", file=sys.stderr)
+        return None, None
     except Exception as e:
         # Log general errors but don't expose sensitive information
-        print(f"General error for {url}: {str(e)}")
-        return None
+        print(f"General error for {url}: {str(e)}", file=sys.stderr)
+        return None, None
 
-def update_product_prices():
+def scrape_variants(urls, timeout=REQUEST_TIMEOUT, metrics=None):
+    """Price links to different variants of one product page, returning {url: (price, step)}.
+    
+    A store JSON endpoint prices every variant from one lookup. Retailers whose
+    page lists every variant (see RetailerParser.page_variants) are then fetched
+    once for the rest; otherwise each remaining variant link is its own page.
+    Raises HostUnavailable while the retailer's circuit breaker is open.
+    """
+    from requests import RequestException
+    
+    parser = get_parser(urls[0])
+    if parser is None:
+        return {url: (None, None) for url in urls}
+    if not host_health.allow(host_key(urls[0])):
+        raise HostUnavailable(host_key(urls[0]))
+    
+    prices = {}
+    if parser.platform is not None:
+        prices = {url: page for url, page in api_prices(urls, parser, timeout, metrics).items() if page[0] is not None}
+    missing = [url for url in urls if url not in prices]
+    if not missing:
+        return prices
+    if not parser.page_variants:
+        # The first page goes out under the check above, which may be the host's probe; the
+        # probe's outcome decides whether the rest are let through
+        checked = True
+        for url in missing:
+            prices[url] = scrape_page(url, timeout, metrics, use_api=False, checked=checked)
+            checked = False
+        return prices
+    
+    page = page_url(urls[0])
     try:
-        response = supabase.table('products').select('id,link').execute()
-        products = [p for p in response.data if p.get('link')]
+        response, html, _ = fetch(page, timeout, metrics=metrics, full=True)
+        response.raise_for_status()
+        variants = parser.variants(html)
+        if not variants:
+            # No variant data on the page: it has one price for every link
+            found = extract_page(page, html, metrics)
+            archive_page(page, response, html, *found)
+            prices.update((url, found) for url in missing)
+            return prices
+        if page_archive is not None:
+            archive_page(page, response, html, *extract_page(page, html, metrics))
+        for url in missing:
+            price = parser.select_variant(url, variants)
+            # Variant prices come from the same markup as the page's variations step
+            prices[url] = (price, 'variations') if price is not None else (None, None)
+            if metrics is not None:
+                metrics.step(parser.name, prices[url][1])
+    except RequestException as e:
+        print(f"Request error for {page}: {str(e)}", file=sys.stderr)
+    except Exception as e:
+        print(f"General error for {page}: {str(e)}", file=sys.stderr)
+    for url in missing:
+        prices.setdefault(url, (None, None))
+    return prices
+
+def scrape_group(group, timeout=REQUEST_TIMEOUT, metrics=None):
+    """Scrape one page for every product linking to it, returning {variant: (price, step)}.
+    
+    group comes from canonical.group_pages; a page whose links select no
+    variant is fetched and extracted once, like scrape_page.
+    """
+    variants = group['variants']
+    if list(variants) == [()]:
+        return {(): scrape_page(variants[()], timeout, metrics)}
+    prices = scrape_variants(list(variants.values()), timeout, metrics)
+    return {variant: prices[url] for variant, url in variants.items()}
+
+# Scraped prices normalised together; the changes among them are sent to Supabase in one bulk write
+DEFAULT_BATCH_SIZE = 50
+
+def price_changed(old_price, new_price):
+    return old_price is None or abs(float(old_price) - new_price) >= 0.005
+
+def values_changed(product, values):
+    """Return whether any normalised value differs from the one already in the product row."""
+    return any(new is not None and price_changed(product.get(column), new)
+               for column, new in zip(NORMALISED_COLUMNS, values))
+
+def price_unit(product):
+    """Return the unit ('pack' or 'kg') of the prices the product's retailer parser reports."""
+    parser = get_parser(product['link'])
+    return parser.price_unit if parser is not None else 'pack'
+
+def write_price_batch(batch):
+    """Write a batch of {'id', 'price', 'price_per_kg', 'protein_per_dollar'} rows in one round-trip
+    and return the ids updated. A None value leaves that column as it is.
+    """
+    response = get_supabase().rpc('bulk_update_prices', {'updates': batch}).execute()
+    if getattr(response, 'error', None):
+        raise RuntimeError(str(response.error))
+    return {str(row['id']) for row in response.data or []}
+
+# Seconds of a run's budget held back for the final database flush
+FLUSH_RESERVE = 5
+
+def iter_price_updates(max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST, host_delay=DEFAULT_HOST_DELAY,
+                       batch_size=DEFAULT_BATCH_SIZE, schedule='all', budget_seconds=None, max_products=None,
+                       state_dir=DEFAULT_CACHE_DIR, product_ids=None, metrics=None, page_size=DEFAULT_PAGE_SIZE,
+                       hosts=None, skip_hosts=None):
+    """Scrape and write prices, yielding ('result', record) per product as soon as it
+    is final and ('summary', record) once at the end.
+
+    The catalogue is read page_size rows at a time and each page flows through
+    fetching, extraction and batched writes before later pages are needed, so
+    callers that stream the records keep memory bounded by the page and batch
+    sizes rather than the catalogue size. Passing product_ids limits the run
+    to those products, which are not part of any sweep, and hosts to the
+    products of those retailer hosts, each swept on its own. Pages of hosts
+    added to the skip_hosts set
+    while the run is in progress are no longer started.
+    Stage timings are collected
+    into metrics (a fresh Metrics unless one is passed in) and summarised in
+    the summary's 'metrics' section.
+    """
+    metrics = metrics or Metrics()
+    state = None
+    try:
+        client = get_supabase()
+        state = ScrapeState(state_dir)
+        seen = {'catalogue': 0, 'selected': 0, 'pages': 0}
         
-        if not products:
-            return {
-                'success': True,
-                'results': [],
-                'summary': {'total': 0, 'updated': 0, 'failed': 0}
-            }
+        def catalogue(sweep_hosts=hosts):
+            for page in iter_catalogue(client, page_size, product_ids, sweep_hosts):
+                seen['catalogue'] += len(page)
+                yield page, state.history(p['id'] for p in page)
         
-        results = []
-        updated_count = 0
-        failed_count = 0
+        # A run limited to some hosts keeps a sweep per host, so a host cut off by the budget resumes
+        # where it stopped; other runs sweep the whole catalogue
+        sweeps = list(hosts) if hosts is not None else [None]
         
-        for product in products:
-            try:
-                price = scrape_price(product['link'])
-                if price:
-                    update_response = supabase.table('products').update({
-                        'price': price,
-                        'updated_at': 'now()'
-                    }).eq('id', product['id']).execute()
-                    
-                    if not getattr(update_response, 'error', None):
-                        updated_count += 1
-                        results.append({
-                            'id': product['id'],
-                            'success': True,
-                            'price': price
-                        })
+        def sweep_of(product):
+            return host_key(product['link']) if hosts is not None else None
+        
+        def choose():
+            # Pick this run's products: everything, the rest of unfinished sweeps, or only those due
+            if schedule == 'due':
+                for page, history in catalogue():
+                    yield select_due(page, history)
+            elif product_ids is not None or (budget_seconds is None and max_products is None):
+                # A full run starts new sweeps; an explicit list of products is not part of any sweep
+                if product_ids is None:
+                    for sweep in sweeps:
+                        state.start_sweep(sweep)
+                for page, _ in catalogue():
+                    yield page
+            else:
+                started = {sweep: state.sweep_started(sweep) for sweep in sweeps}
+                resumed = [sweep for sweep in sweeps if started[sweep] is not None]
+                read, remaining = dict.fromkeys(sweeps, 0), dict.fromkeys(sweeps, 0)
+                if resumed:
+                    for page, history in catalogue(resumed if hosts is not None else None):
+                        by_sweep = {}
+                        for product in page:
+                            by_sweep.setdefault(sweep_of(product), []).append(product)
+                        page = []
+                        for sweep, products in by_sweep.items():
+                            read[sweep] += len(products)
+                            products = select_unswept(products, history, started[sweep])
+                            remaining[sweep] += len(products)
+                            page.extend(products)
+                        yield page
+                # Sweeps that are finished (or never began) start again from the top
+                restarted = [sweep for sweep in sweeps if not remaining[sweep]]
+                if not restarted:
+                    return
+                for sweep in restarted:
+                    state.start_sweep(sweep)
+                    seen['catalogue'] -= read[sweep]
+                for page, _ in catalogue(restarted if hosts is not None else None):
+                    yield page
+        
+        def selected():
+            # One catalogue page at a time, grouped so rows sharing a page are fetched once
+            for page in choose():
+                if max_products is not None:
+                    page = page[:max_products - seen['selected']]
+                seen['selected'] += len(page)
+                groups = group_pages(page)
+                seen['pages'] += len(groups)
+                for group in groups:
+                    if skip_hosts and host_key(group['url']) in skip_hosts:
+                        continue
+                    yield group
+                if max_products is not None and seen['selected'] >= max_products:
+                    return
+        
+        # Stop starting new requests in time to finish inside the budget
+        deadline = None
+        if budget_seconds is not None:
+            deadline = time.monotonic() + max(1.0, budget_seconds - FLUSH_RESERVE)
+        
+        def scrape(group):
+            timeout = REQUEST_TIMEOUT
+            if deadline is not None:
+                timeout = max(1.0, min(timeout, deadline - time.monotonic()))
+            return scrape_group(group, timeout, metrics)
+        
+        counts = {'updated': 0, 'unchanged': 0, 'failed': 0}
+        pending = []
+        
+        def flush():
+            batch = pending[:]
+            pending.clear()
+            # Pack price, price per kg and protein per dollar for the whole batch in one pass
+            start = time.perf_counter()
+            values = normalise([(product, price, price_unit(product)) for product, price, _ in batch])
+            metrics.observe('normalise_seconds', None, time.perf_counter() - start)
+            changed = {str(product['id']): dict(zip(NORMALISED_COLUMNS, row), id=product['id'])
+                       for (product, _, _), row in zip(batch, values) if values_changed(product, row)}
+            written = set()
+            error = 'Failed to update database'
+            if changed:
+                start = time.perf_counter()
+                try:
+                    written = write_price_batch(list(changed.values()))
+                except Exception as e:
+                    error = f'Failed to update database: {str(e)}'
+                    print(f"Database write error for {len(changed)} products: {str(e)}", file=sys.stderr)
+                metrics.observe('write_seconds', None, time.perf_counter() - start)
+            # Rows the database did not confirm are reported individually
+            records = []
+            for (product, price, step), (pack_price, price_per_kg, protein_per_dollar) in zip(batch, values):
+                product_id = str(product['id'])
+                if product_id not in changed or product_id in written:
+                    counts['updated'] += 1
+                    record = {
+                        'id': product['id'],
+                        'success': True,
+                        'price': pack_price if pack_price is not None else price
+                    }
+                    if price_per_kg is not None:
+                        record['price_per_kg'] = price_per_kg
+                    if protein_per_dollar is not None:
+                        record['protein_per_dollar'] = protein_per_dollar
+                    if product_id not in changed:
+                        # Already current in the database, so nothing was written
+                        counts['unchanged'] += 1
+                        record['unchanged'] = True
+                    records.append(dict(record, **price_source(step)))
+                else:
+                    counts['failed'] += 1
+                    records.append({
+                        'id': product['id'],
+                        'success': False,
+                        'error': error
+                    })
+            return records
+        
+        # Scrape concurrently, but keep database writes on this thread
+        limiter = HostLimiter(max_concurrent=per_host, min_delay=host_delay)
+        scraped = run_concurrently(scrape, selected(), lambda g: g['url'], max_workers, limiter, deadline)
+        processed = 0
+        
+        for group, prices, error in scraped:
+            for product, variant in group['products']:
+                processed += 1
+                price, step = prices[variant] if error is None else (None, None)
+                # Products skipped by an open circuit were never attempted, so they stay due
+                if not isinstance(error, HostUnavailable):
+                    state.record(product['id'], price if error is None else None)
+                try:
+                    if error is not None:
+                        raise error
+                    if price:
+                        # Normalised and compared with the row a batch at a time in flush
+                        pending.append((product, price, step))
+                        record = None
                     else:
-                        failed_count += 1
-                        results.append({
+                        counts['failed'] += 1
+                        record = {
                             'id': product['id'],
                             'success': False,
-                            'error': 'Failed to update database'
-                        })
-                else:
-                    failed_count += 1
-                    results.append({
+                            'error': 'Price not found'
+                        }
+                except Exception as e:
+                    counts['failed'] += 1
+                    record = {
                         'id': product['id'],
                         'success': False,
-                        'error': 'Price not found'
-                    })
-            except Exception as e:
-                failed_count += 1
-                results.append({
-                    'id': product['id'],
-                    'success': False,
-                    'error': str(e)
-                })
+                        'error': str(e)
+                    }
+                if record is not None:
+                    yield 'result', record
+                if len(pending) >= batch_size:
+                    for record in flush():
+                        yield 'result', record
+        
+        if pending:
+            for record in flush():
+                yield 'result', record
         
-        return {
+        if not seen['catalogue']:
+            yield 'summary', {
+                'success': True,
+                'summary': {'total': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+            }
+            return
+        
+        yield 'summary', {
             'success': True,
-            'results': results,
             'summary': {
-                'total': len(products),
-                'updated': updated_count,
-                'failed': failed_count
-            }
+                'total': processed,
+                'updated': counts['updated'],
+                'unchanged': counts['unchanged'],
+                'failed': counts['failed']
+            },
+            'schedule': {
+                'mode': schedule,
+                'catalogue': seen['catalogue'],
+                'selected': seen['selected'],
+                'pages': seen['pages'],
+                'deferred': seen['selected'] - processed
+            },
+            'http': dict(http_client.stats(), unavailable_hosts=host_health.open_hosts()),
+            'metrics': metrics.to_json()
         }
         
     except Exception as e:
-        return {
+        yield 'summary', {
             'success': False,
             'error': str(e)
         }
+    finally:
+        if state is not None:
+            state.close()
 
-if __name__ == "__main__":
+def iter_sharded_updates(leases, lease_round, owner=None, lease_ttl=DEFAULT_LEASE_TTL, metrics=None, **options):
+    """Scrape the catalogue a few leased retailer hosts at a time, yielding like iter_price_updates.
+    
+    Workers sharing leases and lease_round split the catalogue between them.
+    Each host is scraped by the worker that claims it (see leases.py), so
+    per-host request limits still hold across workers. A worker claims as many
+    hosts as its fetch threads can serve within the per-host limit, scrapes
+    them together and then claims more. A worker that dies only delays its
+    hosts until their leases expire and other workers claim them. Hosts
+    already finished in the round are skipped. budget_seconds and max_products
+    apply to the whole run, not to each batch of hosts; such a run resumes
+    each host's sweep, and once every host is finished in the round it takes
+    finished hosts again, stalest sweep first.
+    """
+    metrics = metrics or Metrics()
+    owner = owner or default_owner()
+    budget_seconds = options.pop('budget_seconds', None)
+    max_products = options.pop('max_products', None)
+    budgeted = budget_seconds is not None or max_products is not None
+    # Enough hosts at once to keep every fetch thread busy within the per-host limit
+    per_claim = max(1, options.get('max_workers', DEFAULT_MAX_WORKERS) // max(1, options.get('per_host', DEFAULT_PER_HOST)))
+    
+    def stalest_sweeps(candidates):
+        # Hosts whose sweep began longest ago first, so each finished host gets its turn
+        state = ScrapeState(options.get('state_dir', DEFAULT_CACHE_DIR))
+        try:
+            started = {host: state.sweep_started(host) or 0 for host in candidates}
+        finally:
+            state.close()
+        return sorted(candidates, key=started.get)
+    
+    started = time.monotonic()
+    totals = {'total': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    schedule = {}
+    shards = {'round': lease_round, 'owner': owner, 'hosts': 0, 'claimed': [], 'finished': [], 'lost': []}
     try:
-        result = update_product_prices()
-        # Ensure clean JSON output with no extra prints
-        print(json.dumps(result, default=str))
+        hosts = catalogue_hosts(get_supabase(), options.get('page_size', DEFAULT_PAGE_SIZE))
+        shards['hosts'] = len(hosts)
+        while True:
+            budget = None
+            if budget_seconds is not None:
+                budget = budget_seconds - (time.monotonic() - started)
+                if budget <= FLUSH_RESERVE:
+                    break
+            remaining = None
+            if max_products is not None:
+                remaining = max_products - totals['total']
+                if remaining <= 0:
+                    break
+            claimed = []
+            while len(claimed) < per_claim:
+                host = leases.claim(lease_round, [h for h in hosts if h not in claimed], owner, lease_ttl)
+                if host is None and budgeted:
+                    # Every host is held or finished this round. A budgeted run carries on the sweeps of
+                    # finished hosts it has not had yet, so the next run in the round still has work
+                    again = [h for h in hosts if h not in claimed and h not in shards['claimed']]
+                    if again:
+                        host = leases.claim(lease_round, stalest_sweeps(again), owner, lease_ttl, finished=True)
+                if host is None:
+                    break
+                claimed.append(host)
+            if not claimed:
+                break
+            shards['claimed'].extend(claimed)
+            
+            summary = None
+            with LeaseKeeper(leases, lease_round, claimed, owner, lease_ttl) as keeper:
+                for kind, record in iter_price_updates(budget_seconds=budget, max_products=remaining, metrics=metrics,
+                                                       hosts=claimed, skip_hosts=keeper.lost, **options):
+                    if kind == 'result':
+                        yield kind, record
+                    else:
+                        summary = record
+            if not summary['success']:
+                for host in keeper.held():
+                    leases.release(lease_round, host, owner)
+                yield 'summary', summary
+                return
+            # Hosts that lost their lease after a missed renewal are finished by the worker that took them over
+            shards['lost'].extend(keeper.lost)
+            # Products cut off by the budget or max_products leave the hosts to the next worker that claims them
+            finished = not summary.get('schedule', {}).get('deferred') and (
+                remaining is None or summary['summary']['total'] < remaining)
+            for host in keeper.held():
+                if finished:
+                    leases.finish(lease_round, host, owner)
+                    shards['finished'].append(host)
+                else:
+                    leases.release(lease_round, host, owner)
+            for name in totals:
+                totals[name] += summary['summary'][name]
+            for name, value in summary.get('schedule', {}).items():
+                if name != 'mode':
+                    schedule[name] = schedule.get(name, 0) + value
+        
+        yield 'summary', {
+            'success': True,
+            'summary': totals,
+            'schedule': dict(schedule, mode=options.get('schedule', 'all')),
+            'shards': shards,
+            'http': dict(http_client.stats(), unavailable_hosts=host_health.open_hosts()),
+            'metrics': metrics.to_json()
+        }
     except Exception as e:
-        print(json.dumps({
+        yield 'summary', {
             'success': False,
             'error': str(e)
-        }))
\ No newline at end of file
+        }
+
+def collect_updates(updates):
+    """Gather the records of iter_price_updates or iter_sharded_updates into one JSON-ready dict."""
+    results = []
+    for kind, record in updates:
+        if kind == 'result':
+            results.append(record)
+        else:
+            summary = record
+    if not summary['success']:
+        return summary
+    return dict({'success': True, 'results': results}, **summary)
+
+def update_product_prices(**options):
+    """Run a full update and return the results and summary as one JSON-ready dict."""
+    return collect_updates(iter_price_updates(**options))
+
+def run_job(spec, report):
+    """Run one resident-worker job (see worker.py) and return its result."""
+    if spec['type'] == 'url':
+        # Grouped like a catalogue row, so a variant link is priced as that variant
+        group = group_pages([spec], lambda spec: spec['url'])[0]
+        price, step = scrape_group(group)[group['products'][0][1]]
+        report({'success': price is not None})
+        return dict({
+            'success': True,
+            'url': spec['url'],
+            'supported': get_parser(spec['url']) is not None,
+            'price': price
+        }, **price_source(step))
+    
+    options = dict(spec['options'])
+    if spec['type'] == 'products':
+        options['product_ids'] = spec['ids']
+    results = []
+    for kind, record in iter_price_updates(**options):
+        if kind == 'result':
+            results.append(record)
+            report(record)
+        else:
+            summary = record
+    if not summary['success']:
+        return summary
+    return dict({'success': True, 'results': results}, **summary)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape retailer prices and update Supabase products')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help="'json' prints one object at the end; 'ndjson' streams a line per product, then a summary line")
+    parser.add_argument('--serve', action='store_true',
+                        help='stay resident and accept jobs over a local HTTP API instead of running once')
+    parser.add_argument('--host', default=DEFAULT_WORKER_HOST,
+                        help='address the --serve job API listens on')
+    parser.add_argument('--port', type=int, default=DEFAULT_WORKER_PORT,
+                        help='port the --serve job API listens on')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help='maximum concurrent requests across all retailers (1 = sequential)')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help='maximum concurrent requests to a single retailer')
+    parser.add_argument('--host-delay', type=float, default=DEFAULT_HOST_DELAY,
+                        help='minimum seconds between request starts to a single retailer')
+    parser.add_argument('--schedule', choices=['all', 'due'], default='all',
+                        help="'all' sweeps the whole catalogue; 'due' only refreshes products whose interval has passed")
+    parser.add_argument('--budget-seconds', type=float, default=None,
+                        help='stop starting new requests so the run finishes within this many seconds')
+    parser.add_argument('--max-products', type=int, default=None,
+                        help='scrape at most this many products; an unfinished sweep resumes on the next run')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help='processes that parse downloaded pages (defaults to the CPU count; 0 parses on the fetch threads)')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='keep-alive connections kept open per retailer host')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='retries for 429/5xx responses and dropped connections')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF,
+                        help='base seconds for exponential backoff between retries (jittered)')
+    parser.add_argument('--breaker-failures', type=int, default=DEFAULT_FAILURE_THRESHOLD,
+                        help="consecutive failed requests after which a retailer's remaining products are skipped")
+    parser.add_argument('--breaker-cooldown', type=float, default=DEFAULT_COOLDOWN,
+                        help='seconds before a skipped retailer is tried again')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always download pages in full instead of revalidating cached copies')
+    parser.add_argument('--no-fingerprints', action='store_true',
+                        help='always extract prices instead of reusing them while the price markup is unchanged')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='directory holding the page cache and scrape state')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600,
+                        help='hours a cached page is kept without being revalidated')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='maximum compressed size of the page cache before LRU eviction')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help='products read from Supabase per request; memory use grows with this, not the catalogue')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='scraped prices normalised and written to Supabase together')
+    parser.add_argument('--metrics-file', default=None,
+                        help='also write the run\'s stage timings to this file in Prometheus text format')
+    parser.add_argument('--archive', default=None, metavar='DIR',
+                        help='also append every downloaded product page and its extracted price to this archive')
+    parser.add_argument('--replay', default=None, metavar='DIR',
+                        help='re-run the extractors over the pages in this archive offline and report which prices would change')
+    parser.add_argument('--replay-retailer', default=None,
+                        help='only replay pages of this retailer module (e.g. chemistwarehouse)')
+    parser.add_argument('--shard', action='store_true',
+                        help='split the run with other --shard workers, each leasing one retailer host at a time')
+    parser.add_argument('--leases', choices=['sqlite', 'supabase'], default='sqlite',
+                        help="where --shard leases are kept: 'sqlite' in --cache-dir (workers on this machine) "
+                             "or 'supabase' (workers on any machine)")
+    parser.add_argument('--lease-round', default=None,
+                        help='name shared by the workers of one sharded run (defaults to the UTC day, or hour with --schedule due)')
+    parser.add_argument('--lease-ttl', type=float, default=DEFAULT_LEASE_TTL,
+                        help="seconds before a silent worker's host can be claimed by another worker")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help='profile the run: write per-retailer extractor cProfile stats, top allocation sites '
+                             'and per-product timings to this directory (pages are parsed on the fetch threads)')
+    args = parser.parse_args(argv)
+    if args.profile and (args.serve or args.replay):
+        parser.error('--profile profiles a single scraper run; it cannot be combined with --serve or --replay')
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.replay:
+        # Offline: only the archive and the parsers, no network, Supabase or caches
+        try:
+            result = replay_archive(args.replay, max(1, args.parse_workers), args.replay_retailer)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        print(json.dumps(result, default=str))
+        sys.exit(0 if result['success'] else 1)
+    try:
+        http_client = HttpClient(pool_size=args.pool_size, retries=args.retries, backoff=args.backoff)
+        host_health = HostHealth(failure_threshold=args.breaker_failures, cooldown=args.breaker_cooldown)
+        profiler = None
+        if args.profile:
+            from profiling import Profiler, ProfileMetrics
+            # Stands in for the parse pool, so pages are extracted in this process where they can be profiled
+            profiler = parse_pool = Profiler(args.profile)
+            scrape_group = profiler.timed(scrape_group)
+        elif args.parse_workers > 0:
+            parse_pool = ParsePool(workers=args.parse_workers)
+        if not args.no_cache:
+            http_cache = HttpCache(
+                cache_dir=args.cache_dir,
+                ttl=args.cache_ttl * 3600,
+                max_bytes=int(args.cache_max_mb * 1024 * 1024)
+            )
+        if not args.no_fingerprints:
+            price_fingerprints = PriceFingerprints(args.cache_dir)
+        if args.archive:
+            page_archive = PageArchive(args.archive)
+        options = dict(
+            max_workers=args.workers,
+            per_host=args.per_host,
+            host_delay=args.host_delay,
+            batch_size=max(1, args.batch_size),
+            schedule=args.schedule,
+            budget_seconds=args.budget_seconds,
+            max_products=args.max_products,
+            state_dir=args.cache_dir,
+            page_size=max(1, args.page_size)
+        )
+        metrics = ProfileMetrics(profiler) if profiler is not None else Metrics()
+        leases = None
+        if args.shard and not args.serve:
+            leases = SupabaseLeases(get_supabase()) if args.leases == 'supabase' else SqliteLeases(args.cache_dir)
+            updates = iter_sharded_updates(
+                leases,
+                args.lease_round or default_round(args.schedule),
+                lease_ttl=max(1.0, args.lease_ttl),
+                metrics=metrics,
+                **options
+            )
+        else:
+            updates = iter_price_updates(metrics=metrics, **options)
+        if args.serve:
+            # Jobs use the same options as a one-off run unless they override them
+            def run_configured_job(spec, report):
+                spec = dict(spec, options=dict(options, **spec['options']))
+                return run_job(spec, report)
+            serve(run_configured_job, host=args.host, port=args.port)
+        elif args.format == 'ndjson':
+            # One line per product as it finishes, flushed so the caller sees progress
+            for kind, record in updates:
+                print(json.dumps(dict({'type': kind}, **record), default=str), flush=True)
+            if profiler is not None:
+                print(json.dumps(dict({'type': 'profile'}, **profiler.write()), default=str), flush=True)
+        else:
+            result = collect_updates(updates)
+            if profiler is not None:
+                result['profile'] = profiler.write()
+            # Ensure clean JSON output with no extra prints
+            print(json.dumps(result, default=str))
+        if args.metrics_file and not args.serve:
+            metrics.write_prometheus(args.metrics_file)
+        if http_cache is not None:
+            http_cache.close()
+        if price_fingerprints is not None:
+            price_fingerprints.close()
+        if leases is not None:
+            leases.close()
+        if page_archive is not None:
+            page_archive.close()
+        if parse_pool is not None:
+            parse_pool.close()
+        http_client.close()
+    except Exception as e:
+        error = {'success': False, 'error': str(e)}
+        if args.format == 'ndjson':
+            error = dict({'type': 'summary'}, **error)
+        print(json.dumps(error))
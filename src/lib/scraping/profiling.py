@@ -0,0 +1,187 @@
+# src/lib/scraping/profiling.py
+"""Profiling mode for scraper runs (--profile DIR).
+
+Writes to DIR:
+    extract-<retailer>.prof  cProfile stats of that retailer's extractions (``python -m pstats``)
+    extract-<retailer>.txt   the same, as the functions with the most cumulative time
+    allocations.txt          tracemalloc's top allocation sites: the document tree of
+                             each retailer's heaviest page, and what the run still holds
+    products.json            wall time per product and how it splits between stages
+
+The profiler stands in for the parse pool, so pages are extracted on the fetch
+threads where cProfile and tracemalloc can see them, one at a time so each
+profile only holds its own page. None of this is set up without --profile.
+"""
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from retailers import get_parser, module_for
+from metrics import Metrics
+
+# Stack frames tracemalloc keeps per allocation. The listings group by the allocating line, and
+# each extra frame makes every allocation several times slower to trace
+TRACE_FRAMES = 1
+
+# Entries written to each listing
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+# Allocations by the profiler's own machinery, left out of the listings
+IGNORED_FILES = {
+    tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>',
+}
+
+
+class Profiler:
+    """Collects extractor profiles, allocation peaks and per-page stage timings for one run."""
+
+    def __init__(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self._lock = threading.Lock()
+        self._extract_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._extractions = {}
+        self._heaviest = {}
+        self._pages = []
+        tracemalloc.start(TRACE_FRAMES)
+
+    def extract(self, url, html):
+        """Extract like ParsePool.extract, under cProfile and with the allocation peak recorded."""
+        parser = get_parser(url)
+        if parser is None:
+            return None, None, 0.0
+        retailer = module_for(url)
+        profile = cProfile.Profile()
+        with self._extract_lock:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            price, step = profile.runcall(parser.extract_html, html)
+            seconds = time.perf_counter() - start
+            peak = max(0, tracemalloc.get_traced_memory()[1] - base)
+        with self._lock:
+            stats = self._stats.get(retailer)
+            if stats is None:
+                self._stats[retailer] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            counts = self._extractions.setdefault(retailer, {'pages': 0, 'seconds': 0.0, 'peak_bytes': 0})
+            counts['pages'] += 1
+            counts['seconds'] += seconds
+            counts['peak_bytes'] = max(counts['peak_bytes'], peak)
+            if peak >= self._heaviest.get(retailer, (0, None, None))[0]:
+                self._heaviest[retailer] = (peak, url, html)
+        self.stage('extract_peak_bytes', peak)
+        return price, step, seconds
+
+    def close(self):
+        pass
+
+    def stage(self, name, value):
+        """Add value to the named stage of the page being scraped on this thread, if any."""
+        page = getattr(self._local, 'page', None)
+        if page is not None:
+            stages = page['stages']
+            stages[name] = stages.get(name, 0) + value
+
+    def timed(self, scrape_group):
+        """Wrap scrape_group so each page's wall time and stage timings are recorded."""
+        def profiled_group(group, *args, **kwargs):
+            page = {'url': group['url'], 'retailer': module_for(group['url']), 'stages': {}}
+            self._local.page = page
+            start = time.perf_counter()
+            try:
+                return scrape_group(group, *args, **kwargs)
+            finally:
+                page['seconds'] = time.perf_counter() - start
+                self._local.page = None
+                with self._lock:
+                    self._pages.append((page, [product['id'] for product, _ in group['products']]))
+        return profiled_group
+
+    def _products(self):
+        # A page's stages are shared by the products linking to it
+        rows = []
+        for page, product_ids in self._pages:
+            stages = {name: round(value, 6) for name, value in page['stages'].items()}
+            timed = sum(value for name, value in page['stages'].items() if name.endswith('_seconds'))
+            for product_id in product_ids:
+                rows.append({
+                    'id': product_id,
+                    'url': page['url'],
+                    'retailer': page['retailer'],
+                    'products_on_page': len(product_ids),
+                    'seconds': round(page['seconds'], 6),
+                    'stages': stages,
+                    # Waits for retries, backoff and the store API, and anything else not timed by a stage
+                    'other_seconds': round(max(0.0, page['seconds'] - timed), 6),
+                })
+        rows.sort(key=lambda row: row['seconds'], reverse=True)
+        return rows
+
+    @staticmethod
+    def _top(stats):
+        # Filtering the listing rather than the snapshot, which would match every trace
+        listed = (stat for stat in stats if stat.traceback[0].filename not in IGNORED_FILES)
+        return [str(stat) for _, stat in zip(range(TOP_ALLOCATIONS), listed)]
+
+    def _allocations(self):
+        lines = ['# Still allocated at the end of the run:']
+        lines.extend(self._top(tracemalloc.take_snapshot().statistics('lineno')))
+        for retailer, (peak, url, html) in sorted(self._heaviest.items()):
+            # Rebuild the heaviest page's full document tree, as the fallback steps see it. Tracing
+            # restarts first, so the snapshot holds only the tree and diffing the whole heap is not needed
+            parser = get_parser(url)
+            tracemalloc.stop()
+            tracemalloc.start(TRACE_FRAMES)
+            tree = parser.parse(html)
+            snapshot = tracemalloc.take_snapshot()
+            del tree
+            lines.append('')
+            lines.append(f'# {retailer}: {url}')
+            lines.append(f'# extraction peak {peak / 1024:.1f} KiB; full document tree allocations:')
+            lines.extend(self._top(snapshot.statistics('lineno')))
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """Write the profile files and return a summary for the run's JSON result."""
+        files = []
+
+        def path(name):
+            files.append(name)
+            return os.path.join(self.out_dir, name)
+
+        with self._lock:
+            for retailer, stats in sorted(self._stats.items()):
+                stats.dump_stats(path(f'extract-{retailer}.prof'))
+                with open(path(f'extract-{retailer}.txt'), 'w') as f:
+                    stats.stream = f
+                    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+            products = self._products()
+            extractions = {retailer: dict(counts, seconds=round(counts['seconds'], 6))
+                           for retailer, counts in sorted(self._extractions.items())}
+        with open(path('products.json'), 'w') as f:
+            json.dump(products, f, indent=1, default=str)
+        with open(path('allocations.txt'), 'w') as f:
+            f.write(self._allocations())
+        tracemalloc.stop()
+        return {'dir': self.out_dir, 'files': files, 'retailers': extractions}
+
+
+class ProfileMetrics(Metrics):
+    """Metrics that also charge every observation to the page being scraped on the observing thread."""
+
+    def __init__(self, profiler):
+        super().__init__()
+        self.profiler = profiler
+
+    def observe(self, name, retailer, value):
+        super().observe(name, retailer, value)
+        self.profiler.stage(name, value)
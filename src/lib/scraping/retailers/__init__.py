@@ -0,0 +1,65 @@
+# src/lib/scraping/retailers/__init__.py
+"""Registry of per-retailer price parsers, keyed by hostname and loaded on demand."""
+import importlib
+import threading
+from urllib.parse import urlsplit
+
+# Registrable domain -> parser module in this package. Subdomains such as
+# au.myprotein.com or www.coles.com.au resolve by trimming leading labels.
+PARSER_MODULES = {
+    'myprotein.com': 'myprotein',
+    'chemistwarehouse.com.au': 'chemistwarehouse',
+    'costpricesupplements.com.au': 'costpricesupplements',
+    'bulknutrients.com.au': 'bulknutrients',
+    'blackbeltprotein.com.au': 'blackbeltprotein',
+    'coles.com.au': 'coles',
+    'musclenation.org': 'musclenation',
+    'amazon.com': 'amazon',
+    'amazon.com.au': 'amazon',
+    'ppprotein.com.au': 'ppprotein',
+    'topathlete.com.au': 'topathlete',
+    'vpa.com.au': 'vpa',
+    'pure-product.com': 'pureproduct',
+}
+
+_parsers = {}
+_lock = threading.Lock()
+
+
+def module_for(url):
+    """Return the parser module name registered for a URL's host, or None."""
+    host = (urlsplit(url).hostname or '').lower()
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        module_name = PARSER_MODULES.get('.'.join(labels[i:]))
+        if module_name:
+            return module_name
+    return None
+
+
+def load_parser(module_name):
+    """Import a parser module the first time it is needed and return its PARSER.
+
+    A module that only declares a ``SPEC`` gets a SpecParser compiled from it here.
+    """
+    parser = _parsers.get(module_name)
+    if parser is None:
+        with _lock:
+            parser = _parsers.get(module_name)
+            if parser is None:
+                module = importlib.import_module(f'{__name__}.{module_name}')
+                parser = getattr(module, 'PARSER', None)
+                if parser is None:
+                    # Imported here: the spec compiler pulls in bs4, lxml and soupsieve
+                    from .spec import SpecParser
+                    parser = SpecParser(module.SPEC)
+                _parsers[module_name] = parser
+    return parser
+
+
+def get_parser(url):
+    """Return the parser for a product URL, or None if the retailer is unsupported."""
+    module_name = module_for(url)
+    if module_name is None:
+        return None
+    return load_parser(module_name)
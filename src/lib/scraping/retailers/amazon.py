@@ -0,0 +1,32 @@
+# src/lib/scraping/retailers/amazon.py
+SPEC = {
+    'name': 'amazon',
+    # Skip very small prices that might be shipping costs or other fees
+    'min_price': 10,
+    'max_price': 500,
+    'steps': [
+        # a-offscreen holds clean price text for screen readers
+        {
+            'name': 'offscreen',
+            'select': 'span.a-offscreen',
+            'all': True,
+            'pattern': r'\$(\d+\.?\d*)',
+            'markers': ('a-offscreen',),
+        },
+        # Other common Amazon price elements, tried in order. No markers: these
+        # selectors match anywhere on the page
+        {
+            'name': 'price_blocks',
+            'select': ['span.a-price-whole', 'span.a-color-price', 'span#priceblock_ourprice', 'span#priceblock_dealprice'],
+            'pattern': r'\$?(\d+\.?\d*)',
+        },
+    ],
+    'strain': [
+        {'tag': 'span', 'class': 'a-offscreen'},
+        {'tag': 'span', 'class': 'a-price-whole'},
+        {'tag': 'span', 'class': 'a-color-price'},
+        {'tag': 'span', 'attr': 'id', 'prefix': 'priceblock_'},
+    ],
+    # The first a-offscreen span is the buy-box price; the rest of the page is reviews and ads
+    'stop_marker': rb'class="a-offscreen">[^<]*</span>',
+}
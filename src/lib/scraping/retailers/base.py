@@ -0,0 +1,152 @@
+# src/lib/scraping/retailers/base.py
+"""Shared behaviour for retailer price parsers."""
+import hashlib
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .structured import SOURCES as STRUCTURED_SOURCES, marked_tags, structured_markup, structured_price
+
+# Characters after each marked tag that a fingerprint covers, enough for the price text inside it
+REGION_CHARS = 300
+
+
+def class_list(attrs):
+    """Return the classes of a tag from raw parser attributes."""
+    value = attrs.get('class') or ''
+    return value.split() if isinstance(value, str) else list(value)
+
+
+def tag_strainer(predicate):
+    """Build a SoupStrainer that keeps tags for which predicate(name, attrs) is true."""
+    return SoupStrainer(lambda name, attrs: bool(predicate(name, attrs)))
+
+
+class RetailerParser:
+    """Extracts a product price from a retailer page.
+
+    Subclasses list the names of their extraction methods in ``steps``. Each step
+    takes the parsed soup and returns a price that already passed ``in_range``,
+    or None to fall through to the next step.
+
+    A parser may also set ``strainer`` so ``extract_html`` first builds a partial
+    tree holding only the tags its ``fast_steps`` look at, and only parses the
+    full document when the fast path finds nothing.
+
+    Before any tree is built, ``extract_html`` looks for a single unambiguous
+    price in the page's JSON-LD, OpenGraph or microdata. Parsers whose steps
+    return something other than the pack price (e.g. a per-kg price) set
+    ``structured_data = False`` to skip it.
+
+    ``price_unit`` says what the steps return: 'pack' for the price of the
+    pack or 'kg' for a price per kilogram. The scraper's normalisation stage
+    (see ``normalise``) derives the pack price and price per kg from either.
+
+    ``platform`` names a storefront JSON adapter in ``platforms`` ('shopify' or
+    'woocommerce') that the scraper tries before downloading the page at all.
+
+    ``max_bytes`` and ``stop_marker`` (a compiled bytes regex) let the scraper
+    stop downloading once that much of the page, or the markup the steps need,
+    has arrived. If the steps find nothing in the partial page it is fetched again
+    in full.
+
+    Parsers that set ``page_variants`` read every variant's price from one page:
+    ``variants`` returns them from the raw HTML and ``select_variant`` picks the
+    one a product link asks for, so rows for different variants share a fetch.
+
+    ``price_regions`` maps step names to literal markers (e.g. a class name)
+    found inside the opening tag of every element that step reads its price
+    from. ``fingerprint`` hashes those tags and the markup after them, plus the
+    structured data, so the scraper can reuse the last price while they are
+    unchanged. Steps without markers, such as whole-page fallbacks, are always
+    extracted. A marker that is too specific only costs the skip; one that
+    misses part of what the step reads would let a stale price stand.
+    """
+
+    name = ''
+    features = 'lxml'
+    min_price = 20
+    max_price = 200
+    max_inclusive = True
+    steps = ()
+    strainer = None
+    fast_steps = None
+    structured_data = True
+    platform = None
+    max_bytes = None
+    stop_marker = None
+    page_variants = False
+    price_regions = {}
+    price_unit = 'pack'
+
+    def in_range(self, price):
+        """Check a price against this retailer's sanity bounds."""
+        if price < self.min_price:
+            return False
+        return price <= self.max_price if self.max_inclusive else price < self.max_price
+
+    def parse(self, html):
+        """Build the document tree this parser's steps operate on."""
+        return BeautifulSoup(html, self.features)
+
+    def extract_html(self, html):
+        """Extract (price, step name) from raw HTML, trying structured data and the strained fast path first."""
+        if self.structured_data:
+            price, source = structured_price(html, self.in_range)
+            if price is not None:
+                return price, source
+        if self.strainer is not None:
+            partial = BeautifulSoup(html, self.features, parse_only=self.strainer)
+            price, step = self.extract(partial, self.fast_steps)
+            if price is not None:
+                return price, step
+        return self.extract(self.parse(html))
+
+    def variants(self, html):
+        """Return the variants listed in the page's HTML, or None. See ``page_variants``."""
+        return None
+
+    def select_variant(self, url, variants):
+        """Return the in-range price of the variant url links to, or None."""
+        return None
+
+    def fingerprint(self, html, step):
+        """Return a hash of the markup a price found by step depends on, or None.
+
+        That is the step's ``price_regions`` plus the structured data, which
+        is tried before any step. None means step's price cannot be
+        fingerprinted on this page.
+        """
+        if step in STRUCTURED_SOURCES or step not in self.price_regions:
+            # Structured prices never build a tree, so there is no extraction to skip; steps without
+            # markers read the whole page
+            return None
+        regions = list(marked_tags(html, self.price_regions[step], REGION_CHARS))
+        if not regions:
+            return None
+        parts = [self.name, step] + (structured_markup(html) if self.structured_data else []) + regions
+        return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    def extract(self, soup, steps=None):
+        """Run each step in order and return (price, step name) for the first hit."""
+        for step in self.steps if steps is None else steps:
+            try:
+                price = getattr(self, step)(soup)
+            except Exception:
+                # A broken step should not stop the fallbacks after it
+                price = None
+            if price is not None:
+                return price, step
+        return None, None
+
+    def first_match(self, texts, pattern):
+        """Return the first in-range price captured by pattern from texts."""
+        for text in texts:
+            match = pattern.search(text)
+            if match:
+                try:
+                    price = float(match.group(1))
+                except ValueError:
+                    continue
+                if self.in_range(price):
+                    return price
+        return None
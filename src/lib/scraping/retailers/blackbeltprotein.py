@@ -0,0 +1,30 @@
+# src/lib/scraping/retailers/blackbeltprotein.py
+DOLLAR_PRICE = r'\$(\d+\.\d+)'
+
+SPEC = {
+    'name': 'blackbeltprotein',
+    # The page's pack price is not the per kilo price reported here
+    'structured_data': False,
+    'price_unit': 'kg',
+    'steps': [
+        # The price per kg is shown as "$30.60 per kilo" in span.right
+        {
+            'name': 'per_kilo',
+            'select': 'span.right',
+            'all': True,
+            'contains': 'per kilo',
+            'pattern': DOLLAR_PRICE,
+            'markers': ('class="right"', "class='right'"),
+        },
+        # Fallback: any element on the page quoting a per kilo price
+        {
+            'name': 'any_per_kilo',
+            'select': 'span, div, p',
+            'all': True,
+            'contains': ('$', 'per kilo'),
+            'pattern': DOLLAR_PRICE,
+            'fast': False,
+        },
+    ],
+    'strain': [{'tag': 'span', 'class': 'right'}],
+}
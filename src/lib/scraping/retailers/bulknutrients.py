@@ -0,0 +1,8 @@
+# src/lib/scraping/retailers/bulknutrients.py
+SPEC = {
+    'name': 'bulknutrients',
+    'steps': [
+        {'name': 'product_price', 'select': '.product-price', 'markers': ('product-price',)},
+    ],
+    'strain': [{'class': 'product-price'}],
+}
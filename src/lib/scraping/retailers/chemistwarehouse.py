@@ -0,0 +1,21 @@
+# src/lib/scraping/retailers/chemistwarehouse.py
+SPEC = {
+    'name': 'chemistwarehouse',
+    # Bounds for pack prices, from small tubs to 4.5kg+ bulk tubs
+    'min_price': 10,
+    'max_price': 500,
+    'steps': [
+        # The specific price span first, then the legacy ID, then the h2 display price. This is the
+        # pack price; normalisation derives the price per kg from the pack weight
+        {
+            'name': 'product_price',
+            'select': ['span.product__price', 'span[id*="lblActualPrice"]', 'h2.display-l.text-colour-title-light'],
+            'markers': ('product__price', 'lblActualPrice', 'display-l'),
+        },
+    ],
+    'strain': [
+        {'tag': 'span', 'class': 'product__price'},
+        {'tag': 'span', 'attr': 'id', 'contains': 'lblActualPrice'},
+        {'tag': 'h2', 'class': 'display-l'},
+    ],
+}
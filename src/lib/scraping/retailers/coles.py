@@ -0,0 +1,21 @@
+# src/lib/scraping/retailers/coles.py
+SPEC = {
+    'name': 'coles',
+    # Coles products typically range from $5 to $200
+    'min_price': 5,
+    'steps': [
+        # <span class="price__value" data-testid="pricing" aria-label="Price $26.60">$26.60</span>
+        {
+            'name': 'pricing',
+            'select': ['span.price__value[data-testid="pricing"]', 'span[data-testid="pricing"]', 'span.price__value'],
+            # Prefer the visible text, then the aria-label (e.g. "Price $26.60")
+            'source': ['text', '@aria-label'],
+            # Matches $26.60, $26.6, $26, etc.
+            'pattern': r'\$(\d+\.?\d{0,2})',
+            'markers': ('price__value', 'data-testid="pricing"', "data-testid='pricing'"),
+        },
+    ],
+    'strain': [{'tag': 'span', 'attr': 'data-testid', 'equals': 'pricing'}, {'tag': 'span', 'class': 'price__value'}],
+    # Stop once the first complete price__value span has arrived
+    'stop_marker': rb'price__value[^>]*>[^<]*</span>',
+}
@@ -0,0 +1,65 @@
+# src/lib/scraping/retailers/costpricesupplements.py
+import html as html_entities
+import json
+import re
+from urllib.parse import urlsplit, parse_qsl
+
+from .spec import SpecParser
+
+
+class CostPriceSupplementsParser(SpecParser):
+    spec = {
+        'name': 'costpricesupplements',
+        'platform': 'woocommerce',
+        'page_variants': True,
+        'steps': [
+            {'name': 'variations', 'markers': ('data-product_variations',)},
+            # Fallback: the hidden input used by the Google Tag Manager plugin
+            {'name': 'gtm_price', 'select': 'input[name="gtm4wp_price"]', 'source': '@value', 'markers': ('gtm4wp_price',)},
+        ],
+        'strain': [{'tag': 'form', 'class': 'variations_form'}, {'tag': 'input', 'attr': 'name', 'equals': 'gtm4wp_price'}],
+    }
+
+    VARIATIONS_ATTR = re.compile(r'data-product_variations=(?:"([^"]*)"|\'([^\']*)\')')
+
+    def variations(self, soup):
+        # WooCommerce keeps every variation's price in the variations form
+        variations_form = soup.find('form', {'class': 'variations_form'})
+        if not variations_form:
+            return None
+        variations_data = variations_form.get('data-product_variations')
+        if not variations_data:
+            return None
+
+        variations = json.loads(variations_data.replace('&quot;', '"'))
+        return self.choose(variations, {})
+
+    def choose(self, variations, wanted):
+        """Price the variation matching the wanted attributes, or by default the first in-stock one."""
+        if wanted:
+            # An empty attribute value on a variation means "any"
+            chosen = next((
+                v for v in variations
+                if all((v.get('attributes') or {}).get(k, '').lower() in ('', value) for k, value in wanted.items())
+            ), None)
+        else:
+            chosen = next((v for v in variations if v.get('is_in_stock', False)), None)
+        if chosen is None or not chosen.get('display_price'):
+            return None
+        price = float(chosen['display_price'])
+        return price if self.in_range(price) else None
+
+    def variants(self, html):
+        # The variations form attribute, read without building a tree
+        match = self.VARIATIONS_ATTR.search(html)
+        if not match:
+            return None
+        variations = json.loads(html_entities.unescape(match.group(1) or match.group(2)))
+        return variations if isinstance(variations, list) and variations else None
+
+    def select_variant(self, url, variants):
+        wanted = {k.lower(): v.lower() for k, v in parse_qsl(urlsplit(url).query) if k.lower().startswith('attribute_') and v}
+        return self.choose(variants, wanted)
+
+
+PARSER = CostPriceSupplementsParser()
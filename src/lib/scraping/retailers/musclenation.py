@@ -0,0 +1,19 @@
+# src/lib/scraping/retailers/musclenation.py
+SPEC = {
+    'name': 'musclenation',
+    # Muscle Nation products typically range from $10 to $300
+    'min_price': 10,
+    'max_price': 300,
+    'platform': 'shopify',
+    'steps': [
+        {
+            'name': 'money',
+            'select': ['span.money[data-currency="AUD"]', 'span.money'],
+            # Prefer the data-default-currency attribute, then the element text
+            'source': ['@data-default-currency', 'text'],
+            'pattern': r'A?\$(\d+\.?\d*)',
+            'markers': ('class="money"', "class='money'"),
+        },
+    ],
+    'strain': [{'tag': 'span', 'class': 'money'}],
+}
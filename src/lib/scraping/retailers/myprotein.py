@@ -0,0 +1,47 @@
+# src/lib/scraping/retailers/myprotein.py
+import re
+
+from .spec import SpecParser
+
+AUD_PRICE = re.compile(r'A\$(\d+\.\d+)')
+DOLLAR_PRICE = re.compile(r'\$(\d+\.\d+)')
+
+
+class MyProteinParser(SpecParser):
+    spec = {
+        'name': 'myprotein',
+        'max_price': 500,
+        'steps': [
+            # The main price display is a span with the text-2xl font-semibold classes
+            {
+                'name': 'main_price',
+                'select': 'span.text-2xl.font-semibold',
+                'all': True,
+                'contains': 'A$',
+                'pattern': AUD_PRICE.pattern,
+                'markers': ('text-2xl',),
+            },
+            # No markers: page_scan reads every span, div and p on the page
+            {'name': 'page_scan', 'fast': False},
+        ],
+        'strain': [{'tag': 'span', 'class': 'text-2xl'}],
+    }
+
+    def page_scan(self, soup):
+        # Fallback: any A$ price that is not a per-kg price or a review score,
+        # then any $ price. Both are collected in a single pass over the page.
+        dollar_price = None
+        for element in soup.find_all(['span', 'div', 'p']):
+            text = element.get_text(strip=True)
+            if '$' not in text or '/kg' in text or 'out of 5' in text:
+                continue
+            if 'A$' in text:
+                price = self.first_match([text], AUD_PRICE)
+                if price is not None:
+                    return price
+            if dollar_price is None:
+                dollar_price = self.first_match([text], DOLLAR_PRICE)
+        return dollar_price
+
+
+PARSER = MyProteinParser()
@@ -0,0 +1,139 @@
+# src/lib/scraping/retailers/platforms.py
+"""Price lookups through Shopify and WooCommerce storefront JSON endpoints.
+
+These endpoints return a few KB of JSON with every variant's price and stock
+status, instead of a full product page. Adapters take a get_json(url)
+callable so the scraper's pooled client, rate limits and metrics apply.
+"""
+import re
+from urllib.parse import urlsplit, parse_qs, parse_qsl, urlencode
+
+
+class EndpointUnavailable(Exception):
+    """Raised by get_json when a store does not expose the endpoint (e.g. 401/403/404)."""
+
+
+class ShopifyAdapter:
+    """Reads /products/<handle>.js, whose variant prices are in cents."""
+
+    name = 'shopify'
+    step = 'shopify_json'
+
+    def variants(self, url, get_json):
+        """Return [{'id', 'price', 'available'}] in the store's variant order, or None."""
+        parts = urlsplit(url)
+        segments = [s for s in parts.path.split('/') if s]
+        if 'products' not in segments or segments[-1] == 'products':
+            return None
+        handle = segments[segments.index('products') + 1]
+        product = get_json(f'{parts.scheme}://{parts.netloc}/products/{handle}.js')
+        return [
+            {
+                'id': str(variant.get('id')),
+                'price': variant['price'] / 100 if isinstance(variant.get('price'), int) else float(variant['price']),
+                'available': bool(variant.get('available', True)),
+            }
+            for variant in product.get('variants') or []
+        ]
+
+    def select(self, url, variants, in_range):
+        """The ?variant= in the link if present, else the first available variant, as the page shows."""
+        wanted = (parse_qs(urlsplit(url).query).get('variant') or [None])[0]
+        chosen = None
+        if wanted:
+            chosen = next((v for v in variants if v['id'] == wanted), None)
+        if chosen is None:
+            chosen = next((v for v in variants if v['available']), variants[0] if variants else None)
+        if chosen is not None and in_range(chosen['price']):
+            return chosen['price']
+        return None
+
+
+class WooCommerceAdapter:
+    """Reads the WooCommerce Store API, whose prices are strings in minor units."""
+
+    name = 'woocommerce'
+    step = 'woocommerce_api'
+
+    @staticmethod
+    def _price(product):
+        prices = product.get('prices') or {}
+        return int(prices['price']) / 10 ** int(prices.get('currency_minor_unit', 2))
+
+    @staticmethod
+    def _slug(value):
+        # Attribute values as they appear in attribute_* query parameters ('2.27kg' -> '2-27kg')
+        return re.sub(r'[^a-z0-9]+', '-', str(value).lower()).strip('-')
+
+    def variants(self, url, get_json):
+        parts = urlsplit(url)
+        segments = [s for s in parts.path.split('/') if s]
+        if not segments:
+            return None
+        endpoint = f'{parts.scheme}://{parts.netloc}/wp-json/wc/store/v1/products'
+        products = get_json(f"{endpoint}?{urlencode({'slug': segments[-1]})}")
+        if not products:
+            return None
+        product = products[0]
+        if product.get('type') != 'variable':
+            return [{'id': str(product.get('id')), 'price': self._price(product), 'available': bool(product.get('is_in_stock', True))}]
+        # The parent lists each variation's attribute values; the variations carry the prices
+        attributes = {
+            str(variation.get('id')): {self._slug(a.get('value')) for a in variation.get('attributes') or []}
+            for variation in product.get('variations') or []
+        }
+        # Variations in menu order, which is the order of the product page's variations form
+        query = urlencode({'type': 'variation', 'parent': product['id'], 'orderby': 'menu_order', 'order': 'asc', 'per_page': 100})
+        return [
+            {
+                'id': str(variation.get('id')),
+                'price': self._price(variation),
+                'available': bool(variation.get('is_in_stock')),
+                'attributes': attributes.get(str(variation.get('id')), set()),
+            }
+            for variation in get_json(f'{endpoint}?{query}') or []
+        ]
+
+    def select(self, url, variants, in_range):
+        """The variation matching the link's attribute_* values, else the first in-stock one as the page shows."""
+        wanted = {self._slug(v) for k, v in parse_qsl(urlsplit(url).query) if k.startswith('attribute_') and v}
+        if wanted:
+            # A link to a variation the API does not describe is left to the page's variations form
+            chosen = next((v for v in variants if wanted <= v.get('attributes', set())), None)
+            if chosen is not None and in_range(chosen['price']):
+                return chosen['price']
+            return None
+        chosen = next((v for v in variants if v['available']), None)
+        if chosen is None and len(variants) == 1:
+            # A simple product's price stands even when it is out of stock
+            chosen = variants[0]
+        if chosen is not None and in_range(chosen['price']):
+            return chosen['price']
+        return None
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (ShopifyAdapter(), WooCommerceAdapter())}
+
+# Step names reported for prices found through an adapter
+STEPS = tuple(adapter.step for adapter in ADAPTERS.values())
+
+
+def platform_prices(platform, urls, get_json, in_range):
+    """Return {url: (price, step)} for links to variants of one product, from a single lookup.
+
+    Links whose variant has no in-range price map to (None, None).
+    EndpointUnavailable from get_json propagates so the caller can stop trying
+    the endpoint for that store.
+    """
+    adapter = ADAPTERS[platform]
+    variants = adapter.variants(urls[0], get_json)
+    prices = {}
+    for url in urls:
+        price = adapter.select(url, variants, in_range) if variants else None
+        prices[url] = (price, adapter.step) if price is not None else (None, None)
+    return prices
+
+
+def platform_price(platform, url, get_json, in_range):
+    """Return (price, step) from the platform's JSON endpoint, or (None, None)."""
+    return platform_prices(platform, [url], get_json, in_range)[url]
@@ -0,0 +1,19 @@
+# src/lib/scraping/retailers/ppprotein.py
+SPEC = {
+    'name': 'ppprotein',
+    'platform': 'shopify',
+    'steps': [
+        {
+            'name': 'sale_price',
+            'select': [
+                'span.price-item.price-item--sale.price-item--last',
+                'span.price-item.price-item--sale',
+                'span.price-item--sale',
+            ],
+            'pattern': r'\$(\d+\.?\d*)',
+            'markers': ('price-item--sale',),
+        },
+    ],
+    'strain': [{'tag': 'span', 'class': 'price-item--sale'}],
+    'stop_marker': rb'price-item--sale[^>]*>[^<]*</span>',
+}
@@ -0,0 +1,23 @@
+# src/lib/scraping/retailers/pureproduct.py
+DOLLAR_PRICE = r'\$(\d+\.?\d{0,2})'
+
+# Every step but any_bdi reads the price-money/price__regular markup
+PRICE_MARKUP = ('<price-money', 'price__regular', 'price__prefix')
+
+# Prices live in div.price__regular > dd > span > price-money > bdi, e.g.
+# <bdi><span class="price__prefix">$</span>48<sup class="price__suffix">.00</sup> AUD</bdi>
+SPEC = {
+    'name': 'pureproduct',
+    'steps': [
+        {'name': 'regular_bdi', 'select': 'div.price__regular price-money bdi', 'pattern': DOLLAR_PRICE, 'markers': PRICE_MARKUP},
+        {'name': 'price_money', 'select': 'price-money bdi', 'pattern': DOLLAR_PRICE, 'markers': PRICE_MARKUP},
+        {'name': 'prefix_parent', 'select': 'bdi:has(span.price__prefix)', 'pattern': DOLLAR_PRICE, 'markers': PRICE_MARKUP},
+        {
+            'name': 'any_bdi',
+            'select': 'bdi:has(span.price__prefix, sup.price__suffix)',
+            'all': True,
+            'pattern': DOLLAR_PRICE,
+        },
+    ],
+    'strain': [{'tag': ('price-money', 'bdi')}, {'tag': 'div', 'class': 'price__regular'}],
+}
@@ -0,0 +1,250 @@
+# src/lib/scraping/retailers/spec.py
+"""Declarative retailer specs, compiled once into parser steps.
+
+A spec is a dict of RetailerParser settings (name, min_price, max_price,
+max_inclusive, price_unit, structured_data, platform, max_bytes, page_variants
+and stop_marker, given as a bytes pattern) plus:
+
+``steps``, tried in order. Each is a dict with a ``name`` and:
+    ``select``: a CSS selector or a list of them, tried in order
+    ``all``: read every element a selector matches, not just the first
+    ``source``: 'text', '@attribute', or a list of them tried in order
+    ``contains``: text (or a list of texts) a source must contain, ignoring case
+    ``pattern``: a regex whose first group is the price; without one the
+    whole source, less '$' and ',', must be a number
+    ``markers``: the step's ``price_regions`` markers
+    ``fast``: False to leave the step out of the strained fast path
+A step without ``select`` names a method of the parser class instead, for
+pages a selector cannot describe.
+
+``strain``: rules for the fast path's strainer; a tag is kept if it matches
+every key of any rule: ``tag`` (a name or list of names), ``class``, and
+``attr`` with ``equals``, ``contains`` or ``prefix`` (or just present).
+
+Selectors, patterns and the strainer are compiled when the parser is built,
+so extracting a page only runs them. Selectors made only of tag names,
+classes, ids and attribute tests (=, *= or ^=), joined by spaces or commas,
+become a plain test run over the tree's tags; anything else is compiled
+with soupsieve.
+"""
+import re
+
+import soupsieve
+from bs4.element import Tag
+
+from .base import RetailerParser, class_list, tag_strainer
+
+# Spec keys copied onto the parser as they are
+SETTINGS = (
+    'name', 'min_price', 'max_price', 'max_inclusive', 'price_unit', 'structured_data', 'platform',
+    'max_bytes', 'page_variants',
+)
+
+
+# One part of a simple compound selector: .class, #id or [attr], [attr="v"], [attr*="v"], [attr^="v"]
+SIMPLE_PART = re.compile(r'([.#])([\w-]+)|\[([\w-]+)(?:([*^]?)="([^"]*)")?\]')
+SIMPLE_SELECTOR = re.compile(r'([a-z][\w-]*)?((?:' + SIMPLE_PART.pattern + r')*)', re.IGNORECASE)
+
+
+def _as_tuple(value):
+    if value is None:
+        return ()
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+def _simple_test(selector):
+    # A tag test for a simple compound selector, or None if selector is not one
+    match = SIMPLE_SELECTOR.fullmatch(selector.strip())
+    if not match:
+        return None
+    name = match.group(1)
+    classes, attrs = set(), []
+    for part in SIMPLE_PART.finditer(match.group(2)):
+        kind, value, attr, op, expected = part.groups()
+        if kind == '.':
+            classes.add(value)
+        elif kind == '#':
+            attrs.append(('id', '', value))
+        else:
+            attrs.append((attr, op if expected is not None else None, expected))
+
+    def test(tag):
+        if name is not None and tag.name != name:
+            return False
+        if classes and not classes.issubset(tag.attrs.get('class') or ()):
+            return False
+        for attr, op, expected in attrs:
+            value = tag.attrs.get(attr)
+            if value is None:
+                return False
+            if op == '' and value != expected:
+                return False
+            if op == '*' and expected not in value:
+                return False
+            if op == '^' and not value.startswith(expected):
+                return False
+        return True
+
+    return test
+
+
+def _descendant_test(selector):
+    # A tag test for simple compound selectors joined by descendant combinators ("div.a span b"),
+    # checked right to left through the tag's ancestors, or None
+    tests = [_simple_test(part) for part in selector.split()]
+    if not tests or not all(tests):
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    last, ancestors = tests[-1], tests[-2::-1]
+
+    def test(tag):
+        if not last(tag):
+            return False
+        remaining = iter(ancestors)
+        wanted = next(remaining)
+        for parent in tag.parents:
+            if parent.__class__ is Tag and wanted(parent):
+                wanted = next(remaining, None)
+                if wanted is None:
+                    return True
+        return False
+
+    return test
+
+
+class SimpleSelector:
+    """Matches simple selectors by testing each tag in document order, as soupsieve would."""
+
+    def __init__(self, tests):
+        self.test = tests[0] if len(tests) == 1 else (lambda tag: any(test(tag) for test in tests))
+
+    def iselect(self, soup):
+        test = self.test
+        for element in soup.descendants:
+            if element.__class__ is Tag and test(element):
+                yield element
+
+    def select_one(self, soup):
+        return next(self.iselect(soup), None)
+
+
+def compile_selector(selector):
+    """Compile a CSS selector into an object with soupsieve's select_one and iselect."""
+    tests = [_descendant_test(part) for part in selector.split(',')]
+    if all(tests):
+        return SimpleSelector(tests)
+    return soupsieve.compile(selector)
+
+
+def compile_step(step, in_range):
+    """Compile one step spec into a function from a soup to an in-range price or None."""
+    selectors = [compile_selector(selector) for selector in _as_tuple(step['select'])]
+    sources = [None if source == 'text' else source[1:] for source in _as_tuple(step.get('source', 'text'))]
+    needles = [needle.lower() for needle in _as_tuple(step.get('contains'))]
+    pattern = re.compile(step['pattern']) if step.get('pattern') else None
+    read_all = step.get('all', False)
+
+    def price_in(text):
+        if needles:
+            lowered = text.lower()
+            if not all(needle in lowered for needle in needles):
+                return None
+        if pattern is None:
+            value = text.replace('$', '').replace(',', '').strip()
+        else:
+            match = pattern.search(text)
+            if not match:
+                return None
+            value = match.group(1)
+        try:
+            price = float(value)
+        except ValueError:
+            return None
+        return price if in_range(price) else None
+
+    def extract_step(soup):
+        for selector in selectors:
+            elements = selector.iselect(soup) if read_all else (selector.select_one(soup),)
+            for element in elements:
+                if element is None:
+                    continue
+                for attribute in sources:
+                    text = element.get_text(strip=True) if attribute is None else element.get(attribute)
+                    if text and isinstance(text, str):
+                        price = price_in(text)
+                        if price is not None:
+                            return price
+        return None
+
+    extract_step.__name__ = step['name']
+    return extract_step
+
+
+def _rule_test(rule):
+    tags = set(_as_tuple(rule.get('tag')))
+    class_name = rule.get('class')
+    attr = rule.get('attr')
+    equals, contains, prefix = rule.get('equals'), rule.get('contains'), rule.get('prefix')
+
+    def test(name, attrs):
+        if tags and name not in tags:
+            return False
+        if class_name is not None and class_name not in class_list(attrs):
+            return False
+        if attr is not None:
+            value = attrs.get(attr)
+            if value is None:
+                return False
+            if equals is not None and value != equals:
+                return False
+            if contains is not None and contains not in value:
+                return False
+            if prefix is not None and not value.startswith(prefix):
+                return False
+        return True
+
+    return test
+
+
+def compile_strainer(rules):
+    """Build the fast path's SoupStrainer from a spec's ``strain`` rules."""
+    tests = [_rule_test(rule) for rule in rules]
+    return tag_strainer(lambda name, attrs: any(test(name, attrs) for test in tests))
+
+
+class SpecParser(RetailerParser):
+    """A RetailerParser built from a spec (see the module docstring).
+
+    Subclasses set ``spec`` and define methods for the steps a selector cannot
+    describe; modules whose spec needs none just set ``SPEC`` and the registry
+    builds the parser.
+    """
+
+    spec = None
+
+    def __init__(self, spec=None):
+        spec = spec or self.spec
+        for key in SETTINGS:
+            if key in spec:
+                setattr(self, key, spec[key])
+        if spec.get('stop_marker'):
+            self.stop_marker = re.compile(spec['stop_marker'])
+        if spec.get('strain'):
+            self.strainer = compile_strainer(spec['strain'])
+
+        steps, fast_steps, regions = [], [], {}
+        for step in spec['steps']:
+            name = step['name']
+            if 'select' in step:
+                setattr(self, name, compile_step(step, self.in_range))
+            elif not callable(getattr(self, name, None)):
+                raise ValueError(f'{self.name} spec step {name} has no selector and no method')
+            steps.append(name)
+            if step.get('fast', True):
+                fast_steps.append(name)
+            if step.get('markers'):
+                regions[name] = tuple(step['markers'])
+        self.steps = tuple(steps)
+        self.fast_steps = tuple(fast_steps) if len(fast_steps) < len(steps) else None
+        self.price_regions = regions
@@ -0,0 +1,180 @@
+# src/lib/scraping/retailers/structured.py
+"""Price extraction from schema.org JSON-LD, OpenGraph and microdata, scanning the raw HTML without a DOM."""
+import json
+import re
+
+JSON_LD = re.compile(r'<script\b[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+META_TAG = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_PRICE = re.compile(r'(?:property|name)=["\'](?:og|product):price:amount["\']', re.IGNORECASE)
+META_CURRENCY = re.compile(r'(?:property|name)=["\'](?:og|product):price:currency["\']', re.IGNORECASE)
+ITEMPROP_PRICE = re.compile(r'<[a-z]+\b[^>]*\bitemprop=["\']price["\'][^>]*>([^<]*)', re.IGNORECASE)
+ITEMPROP_CURRENCY = re.compile(r'<[a-z]+\b[^>]*\bitemprop=["\']priceCurrency["\'][^>]*>', re.IGNORECASE)
+CONTENT = re.compile(r'\bcontent=["\']([^"\']*)["\']', re.IGNORECASE)
+NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+CURRENCY = 'AUD'
+
+# Step names reported for prices found here
+SOURCES = ('jsonld', 'opengraph', 'microdata')
+
+# Lowercase markers of the meta and microdata tags structured_price reads
+STRUCTURED_MARKERS = (':price:', 'itemprop="price', "itemprop='price")
+# Characters kept after an itemprop tag, which may hold the price as its text
+ITEMPROP_TEXT_CHARS = 40
+
+
+def to_price(value):
+    """Parse '1,299.00', 54.95 or 'A$54.95' into a float, or None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = NUMBER.search(value)
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _objects(data):
+    """Yield every dict in a JSON-LD document, including nested @graph members."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _objects(item)
+    elif isinstance(data, dict):
+        yield data
+        for value in data.values():
+            if isinstance(value, (list, dict)):
+                yield from _objects(value)
+
+
+def _is_type(obj, name):
+    types = obj.get('@type')
+    return name in types if isinstance(types, list) else types == name
+
+
+def _offer_prices(offers):
+    """Yield (price, currency) for every offer, unpacking single-price aggregate offers."""
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+        currency = offer.get('priceCurrency')
+        if _is_type(offer, 'AggregateOffer'):
+            if offer.get('offers'):
+                yield from _offer_prices(offer['offers'])
+                continue
+            # A price range means variants at different prices; the retailer steps pick the right one
+            low, high = to_price(offer.get('lowPrice')), to_price(offer.get('highPrice'))
+            if low is not None and (high is None or high == low):
+                yield low, currency
+            continue
+        price = offer.get('price')
+        if price is None and isinstance(offer.get('priceSpecification'), dict):
+            price = offer['priceSpecification'].get('price')
+            currency = currency or offer['priceSpecification'].get('priceCurrency')
+        yield to_price(price), currency
+
+
+def _single_price(candidates, in_range):
+    """Return the one in-range price among (price, currency) pairs, or None if absent or ambiguous."""
+    candidates = [(p, c) for p, c in candidates if p is not None and in_range(p)]
+    if any(c == CURRENCY for _, c in candidates):
+        candidates = [(p, c) for p, c in candidates if c == CURRENCY]
+    prices = {round(p, 2) for p, _ in candidates}
+    return prices.pop() if len(prices) == 1 else None
+
+
+def jsonld_price(html, in_range):
+    candidates = []
+    for match in JSON_LD.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for obj in _objects(data):
+            if _is_type(obj, 'Product') and obj.get('offers'):
+                candidates.extend(_offer_prices(obj['offers']))
+    return _single_price(candidates, in_range)
+
+
+def opengraph_price(html, in_range):
+    candidates = []
+    currency = None
+    for tag in META_TAG.findall(html):
+        content = CONTENT.search(tag)
+        if content is None:
+            continue
+        if META_PRICE.search(tag):
+            candidates.append(to_price(content.group(1)))
+        elif META_CURRENCY.search(tag):
+            currency = content.group(1).strip().upper()
+    return _single_price([(p, currency) for p in candidates], in_range)
+
+
+def microdata_price(html, in_range):
+    candidates = []
+    for match in ITEMPROP_PRICE.finditer(html):
+        content = CONTENT.search(match.group(0))
+        candidates.append(to_price(content.group(1) if content else match.group(1)))
+    currency = None
+    match = ITEMPROP_CURRENCY.search(html)
+    if match:
+        content = CONTENT.search(match.group(0))
+        currency = content.group(1).strip().upper() if content else None
+    return _single_price([(p, currency) for p in candidates], in_range)
+
+
+EXTRACTORS = (
+    ('jsonld', jsonld_price),
+    ('opengraph', opengraph_price),
+    ('microdata', microdata_price),
+)
+
+
+def marked_tags(html, markers, after=0, search=None):
+    """Yield every tag in html containing one of the literal markers, plus the after characters following it.
+
+    search, if given, is the text searched instead (such as html.lower()); the
+    tags are still cut from html.
+    """
+    search = html if search is None else search
+    for marker in markers:
+        i = search.find(marker)
+        while i != -1:
+            start = max(0, search.rfind('<', 0, i + 1))
+            end = search.find('>', i)
+            end = len(search) if end == -1 else end + 1 + after
+            yield html[start:end]
+            i = search.find(marker, end)
+
+
+def structured_markup(html):
+    """Return the raw JSON-LD, price meta and itemprop price markup that structured_price reads.
+
+    Plain string searches keep this well under the cost of extraction itself.
+    """
+    lower = html.lower()
+    parts = []
+    if 'ld+json' in lower:
+        parts.extend(match.group(0) for match in JSON_LD.finditer(html))
+    parts.extend(marked_tags(html, STRUCTURED_MARKERS, ITEMPROP_TEXT_CHARS, lower))
+    return parts
+
+
+def structured_price(html, in_range):
+    """Return (price, source) from the page's structured data, or (None, None).
+
+    Only an unambiguous price counts: if a source lists several in-range
+    prices (e.g. one per variant) it is skipped, so the retailer's own steps
+    can choose between them.
+    """
+    for source, extractor in EXTRACTORS:
+        try:
+            price = extractor(html, in_range)
+        except Exception:
+            price = None
+        if price is not None:
+            return price, source
+    return None, None
@@ -0,0 +1,16 @@
+# src/lib/scraping/retailers/topathlete.py
+SPEC = {
+    'name': 'topathlete',
+    'steps': [
+        # The price is in the content attribute, e.g. content="55.00"
+        {
+            'name': 'og_price',
+            'select': 'meta[property="og:price:amount"]',
+            'source': '@content',
+            'markers': ('og:price:amount',),
+        },
+    ],
+    'strain': [{'tag': 'meta', 'attr': 'property', 'equals': 'og:price:amount'}],
+    # The og:price meta is in <head>, so the body is never needed
+    'stop_marker': rb'(?i)</head>',
+}
@@ -0,0 +1,12 @@
+# src/lib/scraping/retailers/vpa.py
+SPEC = {
+    'name': 'vpa',
+    # VPA products should be less than $100
+    'max_price': 100,
+    'max_inclusive': False,
+    'steps': [
+        # <div class="cost">$75.00 </div>
+        {'name': 'cost', 'select': 'div.cost', 'pattern': r'\$(\d+\.?\d*)', 'markers': ('class="cost"', "class='cost'")},
+    ],
+    'strain': [{'tag': 'div', 'class': 'cost'}],
+}
@@ -0,0 +1,156 @@
+# src/lib/scraping/scrape_state.py
+"""Per-product scrape history used to decide which products are due for a refresh."""
+import os
+import sqlite3
+import threading
+import time
+
+# Products whose price moves often are refreshed hourly, stable ones daily
+HOT_INTERVAL = 3600
+STABLE_INTERVAL = 24 * 3600
+# A failed scrape is retried after this long rather than waiting a full interval
+RETRY_INTERVAL = 3600
+
+# Volatility is an exponentially weighted share of checks that saw a price change
+VOLATILITY_WEIGHT = 0.3
+HOT_VOLATILITY = 0.2
+
+# Product ids looked up per SQLite statement
+MAX_QUERY_IDS = 500
+
+
+class ScrapeState:
+    """SQLite store of last attempt/success, last price and volatility per product."""
+
+    def __init__(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(state_dir, 'state.sqlite3'), check_same_thread=False)
+        self._db.executescript('''
+            create table if not exists product_state (
+                product_id text primary key,
+                last_attempt real,
+                last_success real,
+                last_price real,
+                volatility real not null default 0,
+                checks integer not null default 0
+            );
+            create table if not exists cursors (
+                name text primary key,
+                value real not null
+            );
+        ''')
+        self._db.commit()
+
+    def history(self, product_ids):
+        """Return {product_id: row dict} for the given products that have history."""
+        product_ids = [str(i) for i in product_ids]
+        rows = []
+        with self._lock:
+            # Stay under SQLite's limit on bound parameters per statement
+            for start in range(0, len(product_ids), MAX_QUERY_IDS):
+                chunk = product_ids[start:start + MAX_QUERY_IDS]
+                rows.extend(self._db.execute(
+                    'select product_id, last_attempt, last_success, last_price, volatility, checks from product_state '
+                    f"where product_id in ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+        return {
+            row[0]: {
+                'last_attempt': row[1],
+                'last_success': row[2],
+                'last_price': row[3],
+                'volatility': row[4],
+                'checks': row[5],
+            }
+            for row in rows
+        }
+
+    def record(self, product_id, price, now=None):
+        """Record a scrape attempt; price is None when it failed."""
+        now = time.time() if now is None else now
+        product_id = str(product_id)
+        with self._lock:
+            row = self._db.execute(
+                'select last_price, volatility, checks from product_state where product_id = ?', (product_id,)
+            ).fetchone()
+            if price is None:
+                self._db.execute(
+                    'insert into product_state (product_id, last_attempt) values (?, ?) '
+                    'on conflict (product_id) do update set last_attempt = excluded.last_attempt',
+                    (product_id, now),
+                )
+            else:
+                last_price, volatility, checks = row or (None, 0.0, 0)
+                changed = last_price is not None and abs(last_price - price) >= 0.005
+                if last_price is not None:
+                    volatility = (1 - VOLATILITY_WEIGHT) * volatility + VOLATILITY_WEIGHT * (1.0 if changed else 0.0)
+                self._db.execute(
+                    'insert or replace into product_state '
+                    '(product_id, last_attempt, last_success, last_price, volatility, checks) values (?, ?, ?, ?, ?, ?)',
+                    (product_id, now, now, price, volatility, checks + 1),
+                )
+            self._db.commit()
+
+    def sweep_started(self, host=None):
+        """Return when the current full sweep began, or None if there is none.
+
+        With host, the sweep is that retailer host's own, as kept by runs limited to some hosts.
+        """
+        with self._lock:
+            row = self._db.execute('select value from cursors where name = ?', (sweep_cursor(host),)).fetchone()
+        return row[0] if row else None
+
+    def start_sweep(self, host=None, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._db.execute('insert or replace into cursors (name, value) values (?, ?)', (sweep_cursor(host), now))
+            self._db.commit()
+        return now
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def sweep_cursor(host=None):
+    """Return the cursors row naming the start of the catalogue's sweep, or of one host's."""
+    return 'sweep_started' if host is None else f'sweep_started:{host}'
+
+
+def refresh_interval(history):
+    """Seconds between successful refreshes for a product's history."""
+    return HOT_INTERVAL if history['volatility'] >= HOT_VOLATILITY else STABLE_INTERVAL
+
+
+def due_at(history):
+    """Return when a product next needs scraping (0 for never-scraped products)."""
+    if history is None or history['last_attempt'] is None:
+        return 0
+    if history['last_success'] is None or history['last_attempt'] > history['last_success']:
+        # The last attempt failed; back off before trying again
+        return history['last_attempt'] + RETRY_INTERVAL
+    return history['last_success'] + refresh_interval(history)
+
+
+def select_due(products, history, now=None):
+    """Return the products that are due, most overdue first."""
+    now = time.time() if now is None else now
+    due = [(due_at(history.get(str(p['id']))), p) for p in products]
+    due = [(at, p) for at, p in due if at <= now]
+    due.sort(key=lambda item: item[0])
+    return [p for _, p in due]
+
+
+def select_unswept(products, history, started):
+    """Return the products not yet attempted in the sweep that began at started.
+
+    The sweep start time acts as a resumable cursor: runs cut short by a budget
+    pick up the remaining products, and a new sweep starts once all are done.
+    """
+    remaining = []
+    for product in products:
+        last_attempt = (history.get(str(product['id'])) or {}).get('last_attempt')
+        if last_attempt is None or last_attempt < started:
+            remaining.append(product)
+    return remaining
@@ -0,0 +1,71 @@
+# src/lib/scraping/tests/test_circuit_probe.py
+"""A recovering host's single probe must not be lost when a variant group falls through to scrape_page."""
+import os
+import sys
+import time
+import unittest
+from datetime import timedelta
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPING_DIR)
+
+import price_scraper  # noqa: E402
+from canonical import group_pages  # noqa: E402
+from fetch_pool import host_key  # noqa: E402
+from host_health import HostHealth  # noqa: E402
+
+PAGE = 'https://pure-product.com/products/grass-fed-whey'
+
+with open(os.path.join(SCRAPING_DIR, 'benchmarks', 'fixtures', 'pureproduct.html'), encoding='utf-8') as f:
+    PAGE_HTML = f.read()
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    encoding = 'utf-8'
+    elapsed = timedelta(seconds=0.01)
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(PAGE_HTML)
+
+
+class CircuitProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = price_scraper.http_client, price_scraper.host_health
+        price_scraper.http_client = self.client = FakeClient()
+        price_scraper.host_health = self.health = HostHealth(failure_threshold=1, cooldown=0.01)
+
+    def tearDown(self):
+        price_scraper.http_client, price_scraper.host_health = self.saved
+
+    def test_variant_pages_after_cooldown(self):
+        host = host_key(PAGE)
+        self.health.failure(host)
+        time.sleep(0.02)
+        products = [{'id': 1, 'link': f'{PAGE}?variant=1'}, {'id': 2, 'link': f'{PAGE}?variant=2'}]
+        group = group_pages(products)[0]
+
+        prices = price_scraper.scrape_group(group)
+
+        self.assertEqual(len(self.client.urls), 2)
+        self.assertTrue(all(price is not None for price, _ in prices.values()))
+        self.assertTrue(self.health.allow(host))
+        self.assertEqual(self.health.open_hosts(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
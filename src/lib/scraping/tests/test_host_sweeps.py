@@ -0,0 +1,62 @@
+# src/lib/scraping/tests/test_host_sweeps.py
+"""Budgeted sharded runs keep each host's sweep and can take finished hosts again."""
+import os
+import sys
+import tempfile
+import unittest
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPING_DIR)
+
+from leases import SqliteLeases  # noqa: E402
+from scrape_state import ScrapeState, select_unswept  # noqa: E402
+
+
+class HostSweepTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state = ScrapeState(self.dir.name)
+
+    def tearDown(self):
+        self.state.close()
+        self.dir.cleanup()
+
+    def test_host_sweeps_are_separate(self):
+        self.state.start_sweep(now=100)
+        self.state.start_sweep('coles.com.au', now=200)
+
+        self.assertEqual(self.state.sweep_started(), 100)
+        self.assertEqual(self.state.sweep_started('coles.com.au'), 200)
+        self.assertIsNone(self.state.sweep_started('amazon.com.au'))
+
+    def test_host_sweep_resumes(self):
+        products = [{'id': 1}, {'id': 2}]
+        started = self.state.start_sweep('coles.com.au', now=100)
+        self.state.record(1, 10.0, now=150)
+
+        history = self.state.history(p['id'] for p in products)
+        self.assertEqual(select_unswept(products, history, started), [{'id': 2}])
+
+
+class FinishedLeaseTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.leases = SqliteLeases(self.dir.name)
+
+    def tearDown(self):
+        self.leases.close()
+        self.dir.cleanup()
+
+    def test_finished_shards_only_with_finished(self):
+        self.assertEqual(self.leases.claim('r', ['a', 'b'], 'one'), 'a')
+        self.assertTrue(self.leases.finish('r', 'a', 'one'))
+
+        self.assertEqual(self.leases.claim('r', ['a', 'b'], 'two'), 'b')
+        self.assertIsNone(self.leases.claim('r', ['a', 'b'], 'three'))
+        self.assertEqual(self.leases.claim('r', ['a', 'b'], 'three', finished=True), 'a')
+        # Held again, so not even a finished claim takes it
+        self.assertIsNone(self.leases.claim('r', ['a', 'b'], 'four', finished=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
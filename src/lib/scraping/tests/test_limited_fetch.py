@@ -0,0 +1,67 @@
+# src/lib/scraping/tests/test_limited_fetch.py
+"""A page read under a stop marker that never matches must still reach the parser in full."""
+import io
+import os
+import sys
+import unittest
+from datetime import timedelta
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPING_DIR)
+
+import requests  # noqa: E402
+
+import price_scraper  # noqa: E402
+from host_health import HostHealth  # noqa: E402
+from metrics import Metrics  # noqa: E402
+
+PAGE = 'https://www.coles.com.au/product/musashi-high-protein-powder-chocolate-milkshake-375g-4566447'
+
+with open(os.path.join(SCRAPING_DIR, 'benchmarks', 'fixtures', 'coles.html'), encoding='utf-8') as f:
+    # Markup drifted away from the stop marker: the price is only under data-testid="pricing"
+    PAGE_HTML = f.read().replace('price__value', 'price__amount')
+
+
+def streamed_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response.encoding = 'utf-8'
+    response.raw = io.BytesIO(body)
+    response.elapsed = timedelta(seconds=0.01)
+    response.url = PAGE
+    return response
+
+
+class FakeClient:
+    def get(self, url, **kwargs):
+        return streamed_response(PAGE_HTML.encode('utf-8'))
+
+
+class LimitedFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = price_scraper.http_client, price_scraper.host_health, price_scraper.http_cache
+        price_scraper.http_client = FakeClient()
+        price_scraper.host_health = HostHealth()
+        price_scraper.http_cache = None
+
+    def tearDown(self):
+        price_scraper.http_client, price_scraper.host_health, price_scraper.http_cache = self.saved
+
+    def test_fetch_without_marker_returns_whole_page(self):
+        response, html, truncated = price_scraper.fetch(PAGE)
+
+        self.assertFalse(truncated)
+        self.assertEqual(html, PAGE_HTML)
+        self.assertEqual(response.content, PAGE_HTML.encode('utf-8'))
+
+    def test_scrape_page_without_marker(self):
+        for metrics in (None, Metrics()):
+            with self.subTest(metrics=metrics):
+                price, step = price_scraper.scrape_page(PAGE, metrics=metrics)
+                self.assertEqual(price, 26.6)
+                self.assertIsNotNone(step)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+# src/lib/scraping/worker.py
+"""Resident scraper worker: a small local HTTP job API around a warm scraper process.
+
+    POST /jobs       {"type": "catalogue"}                    -> 202 {"id": ..., "status": "queued"}
+                     {"type": "products", "ids": ["..."]}
+                     {"type": "url", "url": "https://..."}
+    GET  /jobs/<id>  job status, progress and (when finished) its result
+    GET  /health     liveness and queue depth
+
+Jobs run one at a time on a background thread, reusing the process's imports,
+Supabase client and pooled HTTP sessions. If SCRAPER_WORKER_TOKEN is set, every
+request must send it as "Authorization: Bearer <token>".
+"""
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8799
+
+# Finished jobs kept for status polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 50
+
+# Options a catalogue or products job may override
+JOB_OPTIONS = ('schedule', 'budget_seconds', 'max_products', 'batch_size', 'page_size')
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def validate_job(payload):
+    """Return a normalised job spec, or raise ValueError describing what is wrong."""
+    if not isinstance(payload, dict):
+        raise ValueError('Job must be a JSON object')
+    job_type = payload.get('type')
+    if job_type not in ('catalogue', 'products', 'url'):
+        raise ValueError("type must be one of 'catalogue', 'products' or 'url'")
+
+    spec = {'type': job_type, 'options': {}}
+    if job_type == 'url':
+        url = payload.get('url')
+        if not isinstance(url, str) or urlsplit(url).scheme not in ('http', 'https'):
+            raise ValueError('url jobs need an http(s) url')
+        spec['url'] = url
+        return spec
+
+    if job_type == 'products':
+        ids = payload.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, (str, int)) for i in ids):
+            raise ValueError('products jobs need a non-empty list of ids')
+        spec['ids'] = [str(i) for i in ids]
+
+    for name in JOB_OPTIONS:
+        value = payload.get(name)
+        if value is None:
+            continue
+        if name == 'schedule':
+            if value not in ('all', 'due'):
+                raise ValueError("schedule must be 'all' or 'due'")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f'{name} must be a positive number')
+        spec['options'][name] = value
+    return spec
+
+
+class JobManager:
+    """Queues jobs and runs them in order on one background thread.
+
+    runner(spec, report) does the work: it calls report(record) for each
+    finished product and returns the job's result dict.
+    """
+
+    def __init__(self, runner):
+        self.runner = runner
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name='scraper-jobs', daemon=True)
+        self._thread.start()
+
+    def submit(self, spec):
+        job = {
+            'id': uuid.uuid4().hex,
+            'type': spec['type'],
+            'status': 'queued',
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': {'processed': 0, 'succeeded': 0, 'failed': 0},
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._forget_old_jobs()
+        self._queue.put((job['id'], spec))
+        return self.get(job['id'])
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job, default=str)) if job else None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self._jobs.values() if j['status'] in ('done', 'failed')]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job['id']]
+
+    def _work(self):
+        while True:
+            job_id, spec = self._queue.get()
+            with self._lock:
+                job = self._jobs[job_id]
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+
+            def report(record):
+                with self._lock:
+                    progress = job['progress']
+                    progress['processed'] += 1
+                    progress['succeeded' if record.get('success') else 'failed'] += 1
+
+            try:
+                result = self.runner(spec, report)
+                status, error = ('done', None) if result.get('success', True) else ('failed', result.get('error'))
+            except Exception as e:
+                result, status, error = None, 'failed', str(e)
+            with self._lock:
+                job.update(status=status, result=result, error=error, finished_at=time.time())
+
+
+def make_handler(manager, token=None):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'PriceScraperWorker/1.0'
+
+        def log_message(self, format, *args):
+            sys.stderr.write('worker: %s\n' % (format % args))
+
+        def _send(self, status, body):
+            data = json.dumps(body, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorised(self):
+            if not token:
+                return True
+            supplied = self.headers.get('Authorization', '')
+            if hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+                return True
+            self._send(401, {'success': False, 'error': 'Unauthorised'})
+            return False
+
+        def do_GET(self):
+            if not self._authorised():
+                return
+            path = urlsplit(self.path).path.rstrip('/')
+            if path == '/health':
+                return self._send(200, {'success': True, 'pending': manager.pending()})
+            if path.startswith('/jobs/'):
+                job = manager.get(path[len('/jobs/'):])
+                if job is None:
+                    return self._send(404, {'success': False, 'error': 'Job not found'})
+                return self._send(200, dict({'success': True}, **job))
+            self._send(404, {'success': False, 'error': 'Not found'})
+
+        def do_POST(self):
+            if not self._authorised():
+                return
+            if urlsplit(self.path).path.rstrip('/') != '/jobs':
+                return self._send(404, {'success': False, 'error': 'Not found'})
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > MAX_BODY_BYTES:
+                    raise ValueError('Request body too large')
+                spec = validate_job(json.loads(self.rfile.read(length) or b'{}'))
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                return self._send(400, {'success': False, 'error': str(e)})
+            self._send(202, dict({'success': True}, **manager.submit(spec)))
+
+    return Handler
+
+
+def serve(runner, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve the job API until interrupted."""
+    from http.server import ThreadingHTTPServer
+
+    manager = JobManager(runner)
+    server = ThreadingHTTPServer((host, port), make_handler(manager, os.environ.get('SCRAPER_WORKER_TOKEN')))
+    sys.stderr.write(f'Price scraper worker listening on http://{host}:{server.server_port}\n')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
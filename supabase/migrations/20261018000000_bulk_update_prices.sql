@@ -0,0 +1,19 @@
+-- Run this in the Supabase SQL Editor if you do not use the CLI to apply migrations.
+-- Lets the price scraper write a batch of prices in one request.
+-- `updates` is a JSON array of {"id": "<product uuid>", "price": <number>}.
+create or replace function public.bulk_update_prices(updates jsonb)
+returns table (id uuid)
+language sql
+as $$
+  update public.products as p
+     set price = (u->>'price')::numeric,
+         updated_at = now()
+    from jsonb_array_elements(updates) as u
+   where p.id = (u->>'id')::uuid
+  returning p.id;
+$$;
+
+revoke execute on function public.bulk_update_prices(jsonb) from public, anon, authenticated;
+grant execute on function public.bulk_update_prices(jsonb) to service_role;
+
+comment on function public.bulk_update_prices(jsonb) is 'Batched price writes from src/lib/scraping/price_scraper.py';
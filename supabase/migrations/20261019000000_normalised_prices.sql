@@ -0,0 +1,36 @@
+-- Run this in the Supabase SQL Editor if you do not use the CLI to apply migrations.
+-- Stores the price per kg and protein per dollar the price scraper derives, so pages
+-- and API routes read (and sort by) indexed columns instead of computing them per request.
+
+-- Plain columns written by the scraper; an older generated price_per_kg becomes one too
+alter table public.products add column if not exists price_per_kg numeric;
+alter table public.products alter column price_per_kg drop expression if exists;
+alter table public.products add column if not exists protein_per_dollar numeric;
+alter table public.products alter column protein_per_dollar drop expression if exists;
+
+create index if not exists products_price_per_kg_idx
+  on public.products (price_per_kg asc nulls last);
+create index if not exists products_protein_per_dollar_idx
+  on public.products (protein_per_dollar desc nulls last);
+
+-- `updates` is a JSON array of {"id", "price", "price_per_kg", "protein_per_dollar"};
+-- a null or missing value leaves that column unchanged.
+create or replace function public.bulk_update_prices(updates jsonb)
+returns table (id uuid)
+language sql
+as $$
+  update public.products as p
+     set price = coalesce((u->>'price')::numeric, p.price),
+         price_per_kg = coalesce((u->>'price_per_kg')::numeric, p.price_per_kg),
+         protein_per_dollar = coalesce((u->>'protein_per_dollar')::numeric, p.protein_per_dollar),
+         updated_at = now()
+    from jsonb_array_elements(updates) as u
+   where p.id = (u->>'id')::uuid
+  returning p.id;
+$$;
+
+revoke execute on function public.bulk_update_prices(jsonb) from public, anon, authenticated;
+grant execute on function public.bulk_update_prices(jsonb) to service_role;
+
+comment on column public.products.price_per_kg is 'Pack price over pack weight, written by src/lib/scraping/normalise.py';
+comment on column public.products.protein_per_dollar is 'Grams of protein per dollar, written by src/lib/scraping/normalise.py';
@@ -0,0 +1,88 @@
+-- Run this in the Supabase SQL Editor if you do not use the CLI to apply migrations.
+-- Leases that let several price scraper workers (price_scraper.py --shard --leases supabase)
+-- split a run by retailer host. Each (round, shard) row is held by one worker until it
+-- expires, and is kept with finished_at set once the shard is done for the round.
+create table if not exists public.scrape_leases (
+  round text not null,
+  shard text not null,
+  owner text not null,
+  expires_at timestamptz not null,
+  finished_at timestamptz,
+  primary key (round, shard)
+);
+
+alter table public.scrape_leases enable row level security;
+
+-- Leases the first of `shards` that nobody holds or has finished this round, returning it
+-- (or null when there is none). Each insert either takes a free or expired row or does
+-- nothing, so two workers never get the same shard.
+create or replace function public.claim_scrape_lease(lease_round text, shards text[], lease_owner text, ttl_seconds integer)
+returns text
+language plpgsql
+as $$
+declare
+  candidate text;
+begin
+  foreach candidate in array shards loop
+    insert into public.scrape_leases as l (round, shard, owner, expires_at)
+    values (lease_round, candidate, lease_owner, now() + make_interval(secs => ttl_seconds))
+    on conflict (round, shard) do update
+      set owner = excluded.owner,
+          expires_at = excluded.expires_at
+      where l.finished_at is null and l.expires_at < now();
+    if found then
+      return candidate;
+    end if;
+  end loop;
+  return null;
+end;
+$$;
+
+create or replace function public.renew_scrape_lease(lease_round text, lease_shard text, lease_owner text, ttl_seconds integer)
+returns boolean
+language sql
+as $$
+  with renewed as (
+    update public.scrape_leases
+       set expires_at = now() + make_interval(secs => ttl_seconds)
+     where round = lease_round and shard = lease_shard and owner = lease_owner and finished_at is null
+    returning 1
+  )
+  select exists (select 1 from renewed);
+$$;
+
+create or replace function public.finish_scrape_lease(lease_round text, lease_shard text, lease_owner text)
+returns boolean
+language sql
+as $$
+  with finished as (
+    update public.scrape_leases
+       set finished_at = now()
+     where round = lease_round and shard = lease_shard and owner = lease_owner and finished_at is null
+    returning 1
+  )
+  select exists (select 1 from finished);
+$$;
+
+create or replace function public.release_scrape_lease(lease_round text, lease_shard text, lease_owner text)
+returns boolean
+language sql
+as $$
+  with released as (
+    delete from public.scrape_leases
+     where round = lease_round and shard = lease_shard and owner = lease_owner and finished_at is null
+    returning 1
+  )
+  select exists (select 1 from released);
+$$;
+
+revoke execute on function public.claim_scrape_lease(text, text[], text, integer) from public, anon, authenticated;
+revoke execute on function public.renew_scrape_lease(text, text, text, integer) from public, anon, authenticated;
+revoke execute on function public.finish_scrape_lease(text, text, text) from public, anon, authenticated;
+revoke execute on function public.release_scrape_lease(text, text, text) from public, anon, authenticated;
+grant execute on function public.claim_scrape_lease(text, text[], text, integer) to service_role;
+grant execute on function public.renew_scrape_lease(text, text, text, integer) to service_role;
+grant execute on function public.finish_scrape_lease(text, text, text) to service_role;
+grant execute on function public.release_scrape_lease(text, text, text) to service_role;
+
+comment on table public.scrape_leases is 'Host leases for sharded runs of src/lib/scraping/price_scraper.py';
@@ -0,0 +1,49 @@
+-- Run this in the Supabase SQL Editor if you do not use the CLI to apply migrations.
+-- price_per_kg and protein_per_dollar stopped being generated columns in
+-- 20261019000000_normalised_prices.sql, so rows the scraper does not write (new products,
+-- edits in the dashboard) would keep a null or stale value. This trigger derives them
+-- from the row, as the generated expressions did, unless the change writes them itself.
+
+create or replace function public.fill_normalised_prices()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'INSERT' then
+    new.price_per_kg := coalesce(new.price_per_kg, new.price / nullif(new.weight, 0));
+    new.protein_per_dollar := coalesce(new.protein_per_dollar, new.protein_per_100g * 10 / nullif(new.price_per_kg, 0));
+    return new;
+  end if;
+
+  -- A price or weight edit that leaves price_per_kg alone: recompute it from the weight, or
+  -- scale the old value with the price when the weight is not in the weight column
+  if new.price_per_kg is not distinct from old.price_per_kg
+     and (new.price, new.weight) is distinct from (old.price, old.weight) then
+    new.price_per_kg := coalesce(new.price / nullif(new.weight, 0),
+                                 old.price_per_kg * new.price / nullif(old.price, 0));
+  end if;
+
+  if new.protein_per_dollar is not distinct from old.protein_per_dollar
+     and (new.price_per_kg, new.protein_per_100g) is distinct from (old.price_per_kg, old.protein_per_100g) then
+    new.protein_per_dollar := new.protein_per_100g * 10 / nullif(new.price_per_kg, 0);
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists products_fill_normalised_prices on public.products;
+create trigger products_fill_normalised_prices
+  before insert or update of price, weight, protein_per_100g, price_per_kg, protein_per_dollar
+  on public.products
+  for each row execute function public.fill_normalised_prices();
+
+-- Rows left null since the columns became plain ones
+update public.products
+   set price_per_kg = price / nullif(weight, 0)
+ where price_per_kg is null and weight > 0;
+update public.products
+   set protein_per_dollar = protein_per_100g * 10 / nullif(price_per_kg, 0)
+ where protein_per_dollar is null and price_per_kg > 0;
+
+comment on column public.products.price_per_kg is 'Pack price over pack weight, written by src/lib/scraping/normalise.py, else derived by fill_normalised_prices';
+comment on column public.products.protein_per_dollar is 'Grams of protein per dollar, written by src/lib/scraping/normalise.py, else derived by fill_normalised_prices';
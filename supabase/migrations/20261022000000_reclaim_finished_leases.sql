@@ -0,0 +1,34 @@
+-- Run this in the Supabase SQL Editor if you do not use the CLI to apply migrations.
+-- Lets claim_scrape_lease hand out shards already finished this round, for budgeted runs
+-- (the admin "Update Prices" button) that carry on each host's sweep once the round is done.
+drop function if exists public.claim_scrape_lease(text, text[], text, integer);
+
+-- Leases the first of `shards` that nobody holds or has finished this round (or, with
+-- include_finished, that nobody holds), returning it or null when there is none.
+create or replace function public.claim_scrape_lease(lease_round text, shards text[], lease_owner text, ttl_seconds integer,
+                                                     include_finished boolean default false)
+returns text
+language plpgsql
+as $$
+declare
+  candidate text;
+begin
+  foreach candidate in array shards loop
+    insert into public.scrape_leases as l (round, shard, owner, expires_at)
+    values (lease_round, candidate, lease_owner, now() + make_interval(secs => ttl_seconds))
+    on conflict (round, shard) do update
+      set owner = excluded.owner,
+          expires_at = excluded.expires_at,
+          finished_at = null
+      where (l.finished_at is null and l.expires_at < now())
+         or (include_finished and l.finished_at is not null);
+    if found then
+      return candidate;
+    end if;
+  end loop;
+  return null;
+end;
+$$;
+
+revoke execute on function public.claim_scrape_lease(text, text[], text, integer, boolean) from public, anon, authenticated;
+grant execute on function public.claim_scrape_lease(text, text[], text, integer, boolean) to service_role;
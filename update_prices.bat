@@ -1,7 +1,7 @@
 @echo off
 echo Starting price update...
 echo.
-python src/lib/scraping/price_scraper.py
+python src/lib/scraping/price_scraper.py --shard --leases supabase
 echo.
 echo Price update completed!
 pause 
\ No newline at end of file
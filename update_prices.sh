@@ -1,6 +1,6 @@
 #!/bin/bash
 echo "Starting price update..."
 echo
-python src/lib/scraping/price_scraper.py
+python src/lib/scraping/price_scraper.py --shard --leases supabase
 echo
 echo "Price update completed!" 
\ No newline at end of file